@@ -7,7 +7,8 @@ Uses lightweight paraphrase-MiniLM-L3-v2 model (~200MB) for Render free tier
 
 import logging
 import os
-from typing import List, Union
+import threading
+from typing import ClassVar, List, Union
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,7 @@ class EmbeddingGenerator:
     """
     
     _instance = None
+    _model_lock: ClassVar[threading.Lock] = threading.Lock()
     
     def __new__(cls):
         """
@@ -57,16 +59,18 @@ class EmbeddingGenerator:
     
     @property
     def model(self):
-        """Lazy load the model on first use"""
+        """Lazy load the model on first use (once, even under concurrent first calls)"""
         if self._model is None:
-            try:
-                logger.info(f"🔧 Loading lightweight embedding model: {self.model_name}")
-                from sentence_transformers import SentenceTransformer
-                self._model = SentenceTransformer(self.model_name)
-                logger.info(f"✅ Lightweight embedding model loaded (~200MB memory, dim={self.embedding_dim})")
-            except Exception as e:
-                logger.error(f"❌ Failed to load embedding model: {str(e)}")
-                raise
+            with self._model_lock:
+                if self._model is None:
+                    try:
+                        logger.info(f"🔧 Loading lightweight embedding model: {self.model_name}")
+                        from sentence_transformers import SentenceTransformer
+                        self._model = SentenceTransformer(self.model_name)
+                        logger.info(f"✅ Lightweight embedding model loaded (~200MB memory, dim={self.embedding_dim})")
+                    except Exception as e:
+                        logger.error(f"❌ Failed to load embedding model: {str(e)}")
+                        raise
         return self._model
     
     def encode(self, texts: Union[str, List[str]], normalize: bool = True) -> Union[List[float], List[List[float]]]:
@@ -222,6 +222,14 @@ class MemoryAgent:
             # Format chunks with metadata
             formatted_chunks = []
             for i, chunk in enumerate(chunks):
+                if isinstance(chunk, dict):
+                    # Weaviate already returns {"content", "metadata", "similarity"} dicts
+                    formatted_chunks.append({
+                        "content": chunk.get("content", ""),
+                        "metadata": chunk.get("metadata", {}),
+                        "similarity": chunk.get("similarity", 0.5)
+                    })
+                    continue
                 meta = metadatas[i] if i < len(metadatas) else {}
                 formatted_chunks.append({
                     "content": chunk,
@@ -269,11 +277,13 @@ class MemoryAgent:
             # Format memories for format_memory_context
             formatted_memories = []
             for memory in memories:
+                # Pinecone sends "score"/"topic"; Weaviate sends "similarity"/metadata.query
+                meta = memory.get("metadata") or {}
                 formatted_memories.append({
                     "summary": memory.get("summary", ""),
-                    "similarity": memory.get("score", 0.5),
+                    "similarity": memory.get("similarity", memory.get("score", 0.5)),
                     "metadata": {
-                        "query": memory.get("topic", "Unknown Topic")
+                        "query": meta.get("query") or memory.get("topic", "Unknown Topic")
                     }
                 })
             
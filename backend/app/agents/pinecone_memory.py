@@ -6,20 +6,32 @@ Optimized for low-memory environments (Render free tier)
 Uses lightweight paraphrase-MiniLM-L3-v2 model (~200MB) for Render free tier
 """
 import os
-import json
+import orjson
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from pinecone import Pinecone, ServerlessSpec
 import hashlib
 import logging
+import threading
 import time
 
 logger = logging.getLogger(__name__)
 
+# gRPC client (pinecone[grpc] extra): persistent HTTP/2 channel, parallel upserts
+try:
+    from pinecone.grpc import PineconeGRPC
+    GRPC_AVAILABLE = True
+except ImportError:
+    PineconeGRPC = None
+    GRPC_AVAILABLE = False
+
 # Lightweight model for Render free tier (512MB limit)
 # paraphrase-MiniLM-L3-v2: ~40MB model, ~200MB memory usage, 384 dimensions
 LIGHTWEIGHT_MODEL = "paraphrase-MiniLM-L3-v2"
 
+# Vectors per upsert request (Pinecone recommends <=100 per call / 2MB payload)
+UPSERT_BATCH_SIZE = 100
+
 # Global lazy-loaded embedding model
 _embedding_model = None
 
@@ -35,7 +47,7 @@ def get_embedding_model():
 
 class PineconeMemory:
     def __init__(self, api_key: str, environment: str = "us-east-1", 
-                 embedding_model: str = "paraphrase-MiniLM-L3-v2"):
+                 embedding_model: str = "paraphrase-MiniLM-L3-v2", use_grpc: bool = True):
         """
         Initialize Pinecone memory with API credentials
         
@@ -43,6 +55,7 @@ class PineconeMemory:
             api_key: Pinecone API key
             environment: Pinecone environment (default: us-east-1)
             embedding_model: SentenceTransformer model for embeddings
+            use_grpc: Use the gRPC data-plane client when pinecone[grpc] is installed
         """
         self.api_key = api_key
         self.environment = environment
@@ -50,8 +63,11 @@ class PineconeMemory:
         self._embedding_model = None  # Lazy loaded
         self.embedding_dim = 384  # paraphrase-MiniLM-L3-v2 dimension (same as MiniLM-L6)
         
-        # Initialize Pinecone client
-        self.pc = Pinecone(api_key=api_key)
+        # Initialize Pinecone client (gRPC keeps one multiplexed connection open)
+        self.use_grpc = use_grpc and GRPC_AVAILABLE
+        if use_grpc and not GRPC_AVAILABLE:
+            logger.warning("⚠️ pinecone[grpc] not installed, using REST client")
+        self.pc = PineconeGRPC(api_key=api_key) if self.use_grpc else Pinecone(api_key=api_key)
         
         # Single index name (free tier allows only 1 index)
         self.index_name = "insightor"
@@ -114,6 +130,16 @@ class PineconeMemory:
         """Generate a unique ID for content based on hash"""
         return hashlib.md5(content.encode()).hexdigest()
     
+    def _research_chunk_metadata(self, content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Build size-limited Pinecone metadata for a research chunk"""
+        return {
+            "content": content[:1000],  # Limit content length
+            "query": metadata.get("query", "")[:200],
+            "source": metadata.get("source", "")[:500],
+            "timestamp": metadata.get("timestamp", datetime.now().isoformat()),
+            "type": "research_chunk"
+        }
+    
     def store_research_chunk(self, content: str, metadata: Dict[str, Any]) -> str:
         """
         Store a research chunk in Pinecone
@@ -133,13 +159,7 @@ class PineconeMemory:
             vector_id = self._generate_vector_id(content)
             
             # Prepare metadata (Pinecone has metadata size limits)
-            pinecone_metadata = {
-                "content": content[:1000],  # Limit content length
-                "query": metadata.get("query", "")[:200],
-                "source": metadata.get("source", "")[:500],
-                "timestamp": metadata.get("timestamp", datetime.now().isoformat()),
-                "type": "research_chunk"
-            }
+            pinecone_metadata = self._research_chunk_metadata(content, metadata)
             
             # Store in Pinecone using namespace
             self.index.upsert(
@@ -174,13 +194,39 @@ class PineconeMemory:
         Returns:
             List of stored chunk IDs
         """
-        chunk_ids = []
+        if not chunks:
+            return []
+        
         try:
+            # Encode all chunks in one model call instead of one per chunk
+            vectors_values = self.embedding_model.encode(chunks).tolist()
+            
+            vectors = []
+            chunk_ids = []
             for i, chunk in enumerate(chunks):
                 metadata = metadata_list[i] if i < len(metadata_list) else {}
                 metadata["query"] = query
-                chunk_id = self.store_research_chunk(chunk, metadata)
-                chunk_ids.append(chunk_id)
+                vector_id = self._generate_vector_id(chunk)
+                vectors.append({
+                    "id": vector_id,
+                    "values": vectors_values[i],
+                    "metadata": self._research_chunk_metadata(chunk, metadata)
+                })
+                chunk_ids.append(vector_id)
+            
+            # One upsert per batch rather than one round-trip per chunk
+            batches = [vectors[start:start + UPSERT_BATCH_SIZE] for start in range(0, len(vectors), UPSERT_BATCH_SIZE)]
+            if self.use_grpc:
+                # Issue every batch at once over the shared channel, then wait for all
+                futures = [
+                    self.index.upsert(vectors=batch, namespace=self.research_namespace, async_req=True)
+                    for batch in batches
+                ]
+                for future in futures:
+                    future.result()
+            else:
+                for batch in batches:
+                    self.index.upsert(vectors=batch, namespace=self.research_namespace)
             
             logger.info(f"✅ Added {len(chunk_ids)} research chunks to Pinecone")
             return chunk_ids
@@ -259,8 +305,8 @@ class PineconeMemory:
             pinecone_metadata = {
                 "topic": topic[:200],
                 "summary": summary[:1000],
-                "related_queries": json.dumps(related_queries[:10]),
-                "key_insights": json.dumps(key_insights[:10]),
+                "related_queries": orjson.dumps(related_queries[:10]).decode(),
+                "key_insights": orjson.dumps(key_insights[:10]).decode(),
                 "timestamp": datetime.now().isoformat(),
                 "type": "topic_memory"
             }
@@ -316,7 +362,7 @@ class PineconeMemory:
                 "query": query[:500],
                 "summary": summary[:1000],
                 "key_findings": key_findings[:500] if key_findings else "",
-                "key_insights": json.dumps(insights[:10] if insights else []),
+                "key_insights": orjson.dumps(insights[:10] if insights else []).decode(),
                 "sources_count": sources_count,
                 "timestamp": datetime.now().isoformat(),
                 "type": "topic_memory"
@@ -371,8 +417,8 @@ class PineconeMemory:
                 memory = {
                     "topic": match.metadata.get("topic", ""),
                     "summary": match.metadata.get("summary", ""),
-                    "related_queries": json.loads(match.metadata.get("related_queries", "[]")),
-                    "key_insights": json.loads(match.metadata.get("key_insights", "[]")),
+                    "related_queries": orjson.loads(match.metadata.get("related_queries", "[]")),
+                    "key_insights": orjson.loads(match.metadata.get("key_insights", "[]")),
                     "timestamp": match.metadata.get("timestamp", ""),
                     "score": float(match.score)
                 }
@@ -414,8 +460,8 @@ class PineconeMemory:
                 memory = {
                     "topic": match.metadata.get("topic", ""),
                     "summary": match.metadata.get("summary", ""),
-                    "related_queries": json.loads(match.metadata.get("related_queries", "[]")),
-                    "key_insights": json.loads(match.metadata.get("key_insights", "[]")),
+                    "related_queries": orjson.loads(match.metadata.get("related_queries", "[]")),
+                    "key_insights": orjson.loads(match.metadata.get("key_insights", "[]")),
                     "timestamp": match.metadata.get("timestamp", ""),
                     "score": float(match.score)
                 }
@@ -538,4 +584,31 @@ class PineconeMemory:
             
         except Exception as e:
             logger.error(f"Error retrieving similar chunks: {e}")
-            return {"chunks": [], "metadatas": []}
\ No newline at end of file
+            return {"chunks": [], "metadatas": []}
+
+
+# Global singleton instance
+pinecone_memory = None
+_factory_lock = threading.Lock()
+
+
+def get_pinecone_memory() -> PineconeMemory:
+    """
+    Get or create the global Pinecone memory instance
+    Reuses a single client/index connection pool instead of reconnecting per request
+    
+    Returns:
+        PineconeMemory singleton
+    """
+    global pinecone_memory
+    if pinecone_memory is None:
+        with _factory_lock:
+            # Re-check under the lock: worker threads may race on first use
+            if pinecone_memory is None:
+                from app.config import get_settings
+                settings = get_settings()
+                pinecone_memory = PineconeMemory(
+                    api_key=settings.pinecone_api_key,
+                    environment=settings.pinecone_environment
+                )
+    return pinecone_memory
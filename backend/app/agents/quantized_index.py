@@ -0,0 +1,140 @@
+"""
+QuantizedIndex - In-memory int8 shadow index for fast approximate similarity
+Stores each vector as int8 codes plus a per-vector float32 scale (~4x smaller than FP32)
+Used to pre-filter candidates before an exact FP32 re-rank
+"""
+
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per block; bounds the int32 temporary created during scoring
+SCORE_BLOCK_ROWS = 4096
+
+
+def quantize(vector: np.ndarray):
+    """
+    Symmetrically quantize a vector to int8
+
+    Args:
+        vector: 1-D float vector
+
+    Returns:
+        Tuple of (int8 codes, float32 scale) with vector ~= codes * scale
+    """
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    max_abs = float(np.abs(vector).max()) if vector.size else 0.0
+    scale = max_abs / 127.0 if max_abs > 0 else 1.0
+    codes = np.clip(np.round(vector / scale), -127, 127).astype(np.int8)
+    return codes, np.float32(scale)
+
+
+class QuantizedIndex:
+    """
+    Append-only int8 vector index with per-vector scales
+    Rows are addressed by insertion position (0..N-1)
+    """
+
+    def __init__(self, dim: Optional[int] = None, initial_capacity: int = 256):
+        """
+        Initialize an empty index
+
+        Args:
+            dim: Vector dimension (inferred from the first vector if None)
+            initial_capacity: Rows preallocated before the first resize
+        """
+        self.dim = dim
+        self._capacity = initial_capacity
+        self._size = 0
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _ensure_capacity(self, needed: int):
+        """Allocate or grow (doubling) the preallocated code and scale buffers"""
+        if self._codes is None:
+            self._capacity = max(self._capacity, needed)
+            self._codes = np.zeros((self._capacity, self.dim), dtype=np.int8)
+            self._scales = np.zeros(self._capacity, dtype=np.float32)
+            return
+
+        if needed <= self._capacity:
+            return
+
+        new_capacity = max(needed, self._capacity * 2)
+        codes = np.zeros((new_capacity, self.dim), dtype=np.int8)
+        scales = np.zeros(new_capacity, dtype=np.float32)
+        codes[:self._size] = self._codes[:self._size]
+        scales[:self._size] = self._scales[:self._size]
+        self._codes, self._scales, self._capacity = codes, scales, new_capacity
+
+    def add(self, vector: np.ndarray) -> int:
+        """
+        Quantize and append a vector
+
+        Args:
+            vector: 1-D float vector
+
+        Returns:
+            Row position of the added vector
+        """
+        codes, scale = quantize(vector)
+        if self.dim is None:
+            self.dim = codes.shape[0]
+        elif codes.shape[0] != self.dim:
+            raise ValueError(f"Expected vector of dim {self.dim}, got {codes.shape[0]}")
+
+        self._ensure_capacity(self._size + 1)
+        self._codes[self._size] = codes
+        self._scales[self._size] = scale
+        self._size += 1
+        return self._size - 1
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """
+        Approximate dot-product scores of every stored vector against a query
+
+        Args:
+            query: 1-D float query vector
+
+        Returns:
+            float32 array of length N
+        """
+        if self._size == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        q_codes, q_scale = quantize(query)
+        q_codes = q_codes.astype(np.int32)
+
+        # Integer accumulation in blocks keeps the widened temporary small
+        out = np.empty(self._size, dtype=np.float32)
+        for start in range(0, self._size, SCORE_BLOCK_ROWS):
+            end = min(start + SCORE_BLOCK_ROWS, self._size)
+            acc = self._codes[start:end].astype(np.int32) @ q_codes
+            out[start:end] = acc * (self._scales[start:end] * q_scale)
+        return out
+
+    def candidates(self, query: np.ndarray, k: int, oversample: int = 4) -> np.ndarray:
+        """
+        Pick the approximate top k * oversample rows for exact re-ranking
+
+        Args:
+            query: 1-D float query vector
+            k: Number of final results wanted
+            oversample: Candidate multiplier to absorb quantization error
+
+        Returns:
+            Array of row positions (unordered)
+        """
+        approx = self.scores(query)
+        n_candidates = min(len(approx), max(k, 0) * oversample)
+        if n_candidates <= 0:
+            return np.zeros(0, dtype=np.int64)
+        if n_candidates == len(approx):
+            return np.arange(len(approx))
+        return np.argpartition(-approx, n_candidates - 1)[:n_candidates]
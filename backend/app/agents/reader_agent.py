@@ -4,28 +4,41 @@ Uses BeautifulSoup for content extraction and cleaning
 """
 
 import httpx
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from collections import OrderedDict
 import logging
+import time
 from bs4 import BeautifulSoup
 import re
-import html2text
 
 logger = logging.getLogger(__name__)
 
+# Sentence boundary: whitespace following terminal punctuation
+_SENT_RE = re.compile(r'(?<=[.!?])\s+')
+
 
 class ReaderAgent:
     """
     Agent responsible for fetching and cleaning content from URLs
     """
     
-    def __init__(self, timeout: int = 10):
+    def __init__(self, timeout: int = 10, max_html_bytes: int = 1_000_000,
+                 cache_size: int = 256, cache_ttl: float = 3600.0):
         """
         Initialize Reader Agent
         
         Args:
             timeout: Timeout for HTTP requests in seconds
+            max_html_bytes: Maximum bytes of HTML read per page; the rest is dropped
+            cache_size: Maximum number of URLs kept in the cleaned-content cache
+            cache_ttl: Seconds a cached URL result stays valid
         """
         self.timeout = timeout
+        self.max_html_bytes = max_html_bytes
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        # url -> (expires_at, cleaned_text); LRU order, oldest first
+        self._content_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
@@ -38,21 +51,36 @@ class ReaderAgent:
             url: URL to fetch
             
         Returns:
-            Raw HTML content or None if fetch fails
+            Raw HTML content (truncated to max_html_bytes) or None if fetch fails
         """
         try:
             logger.debug(f"📥 Fetching content from: {url}")
             
             async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
+                async with client.stream(
+                    "GET",
                     url,
                     headers=self.headers,
                     follow_redirects=True
-                )
-                response.raise_for_status()
+                ) as response:
+                    response.raise_for_status()
+                    
+                    # Stream the body and stop at the cap - cleaned text is
+                    # limited to 5000 chars anyway, so huge pages only cost memory/CPU
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes(65536):
+                        body.extend(chunk)
+                        if len(body) >= self.max_html_bytes:
+                            logger.debug(f"✂ Truncated {url} at {self.max_html_bytes} bytes")
+                            break
+                    
+                    html = bytes(body[:self.max_html_bytes]).decode(
+                        response.charset_encoding or "utf-8",
+                        errors="replace"
+                    )
                 
-                logger.debug(f"✓ Successfully fetched: {url} ({len(response.text)} chars)")
-                return response.text
+                logger.debug(f"✓ Successfully fetched: {url} ({len(html)} chars)")
+                return html
                 
         except httpx.RequestError as e:
             logger.warning(f"⚠ Failed to fetch {url}: {str(e)}")
@@ -158,23 +186,25 @@ class ReaderAgent:
             logger.warning(f"⚠ BeautifulSoup extraction failed: {str(e)}")
             return None
     
-    def _fallback_extraction(self, raw_html: str) -> Optional[str]:
+    def _fallback_extraction(self, raw_html: str, soup: Optional[BeautifulSoup] = None) -> Optional[str]:
         """
         Fallback content extraction using basic text extraction
         
         Args:
             raw_html: Raw HTML content
+            soup: Already-parsed tree to reuse instead of parsing raw_html again
             
         Returns:
             Extracted text or None
         """
         try:
-            # Convert HTML to markdown then to text
-            h = html2text.HTML2Text()
-            h.ignore_links = False
-            h.ignore_images = True
+            # Pull text straight from the DOM - no HTML-to-markdown round trip
+            if soup is None:
+                soup = BeautifulSoup(raw_html, 'html.parser')
+                for tag in soup(['script', 'style', 'noscript']):
+                    tag.decompose()
             
-            text = h.handle(raw_html)
+            text = soup.get_text(separator=' ')
             cleaned = self._clean_text(text)
             
             if len(cleaned) > 100:
@@ -188,6 +218,25 @@ class ReaderAgent:
             logger.warning(f"⚠ Fallback extraction failed: {str(e)}")
             return None
     
+    def _get_cached(self, url: str) -> Optional[str]:
+        """Return cached cleaned text for a URL if present and not expired"""
+        entry = self._content_cache.get(url)
+        if entry is None:
+            return None
+        expires_at, cleaned = entry
+        if expires_at < time.monotonic():
+            del self._content_cache[url]
+            return None
+        self._content_cache.move_to_end(url)
+        return cleaned
+    
+    def _set_cached(self, url: str, cleaned: str):
+        """Store cleaned text for a URL, evicting the least recently used entry"""
+        self._content_cache[url] = (time.monotonic() + self.cache_ttl, cleaned)
+        self._content_cache.move_to_end(url)
+        while len(self._content_cache) > self.cache_size:
+            self._content_cache.popitem(last=False)
+    
     async def process_urls(self, urls: List[str]) -> List[dict]:
         """
         Process multiple URLs concurrently
@@ -200,11 +249,24 @@ class ReaderAgent:
         """
         results = []
         
-        for url in urls:
+        # Drop duplicate URLs (keeping order) so each page is fetched once
+        for url in dict.fromkeys(urls):
+            cached = self._get_cached(url)
+            if cached is not None:
+                logger.debug(f"⚡ Cache hit for: {url}")
+                results.append({
+                    "url": url,
+                    "cleaned_text": cached,
+                    "status": "success"
+                })
+                continue
+            
             try:
                 raw_content = await self.fetch_content(url)
                 if raw_content:
                     cleaned = self.clean_content(raw_content)
+                    if cleaned:
+                        self._set_cached(url, cleaned)
                     results.append({
                         "url": url,
                         "cleaned_text": cleaned,
@@ -227,7 +289,7 @@ class ReaderAgent:
         
         return results
     
-    async def extract_key_sentences(self, text: str, num_sentences: int = 3) -> List[str]:
+    def extract_key_sentences(self, text: str, num_sentences: int = 3) -> List[str]:
         """
         Extract key sentences from cleaned text
         
@@ -238,12 +300,17 @@ class ReaderAgent:
         Returns:
             List of key sentences
         """
-        if not text:
+        if not text or num_sentences <= 0:
             return []
         
-        # Simple sentence splitting
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        # Simple sentence splitting; stop as soon as N sentences are collected
+        sentences = []
+        for sentence in _SENT_RE.split(text):
+            sentence = sentence.strip()
+            if sentence:
+                sentences.append(sentence)
+                if len(sentences) >= num_sentences:
+                    break
         
         # Return first N sentences as key insights
-        return sentences[:num_sentences]
+        return sentences
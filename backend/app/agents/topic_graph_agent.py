@@ -3,13 +3,32 @@ TopicGraphAgent - Lightweight knowledge graph for tracking research topics and r
 Maintains topic relationships using embeddings and stores in ChromaDB
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
+
+from app.agents.quantized_index import QuantizedIndex
 
 logger = logging.getLogger(__name__)
 
+# Above this many topics per user, pre-filter with the int8 shadow index and
+# only re-rank the surviving candidates in FP32
+QUANTIZED_PREFILTER_MIN_TOPICS = 2048
+
+# add_topic calls arriving within this window are embedded in one batch
+TOPIC_BATCH_WINDOW = 0.01
+
+# Users whose topics are kept in memory; the least recently used is dropped first
+TOPIC_MAX_USERS = 1024
+
+# Topics kept per user; once exceeded, the oldest quarter is dropped in one go
+# so the shadow index is rebuilt rarely rather than on every add
+TOPIC_MAX_PER_USER = 4096
+
 
 class TopicGraphAgent:
     """
@@ -29,6 +48,19 @@ class TopicGraphAgent:
         self.chroma_memory = chroma_memory
         self.embedder = embedder
         self.topics_collection = "topic_graph"
+        
+        # In-memory hot path, per user: topic records, their L2-normalized
+        # embeddings, and a lazily (re)built (N, D) float32 matrix of those rows
+        self._topics: Dict[str, List[Dict[str, Any]]] = {}
+        self._topic_vectors: Dict[str, List[np.ndarray]] = {}
+        self._topic_matrix: Dict[str, np.ndarray] = {}
+        self._topic_index: Dict[str, QuantizedIndex] = {}
+        # Users in least- to most-recently-used order, bounded by TOPIC_MAX_USERS
+        self._topic_users: "OrderedDict[str, None]" = OrderedDict()
+        
+        # Single add_topic calls waiting for the next coalesced batch
+        self._pending_topics: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
         logger.info("🗺️  TopicGraphAgent initialized")
     
     async def add_topic(
@@ -50,31 +82,147 @@ class TopicGraphAgent:
         Returns:
             Topic ID
         """
+        # Coalesce with other add_topic calls in the same short window so the
+        # embedder runs once per batch instead of once per topic
+        future = asyncio.get_running_loop().create_future()
+        self._pending_topics.append(({
+            "query": query,
+            "summary": summary,
+            "user_id": user_id,
+            "metadata": metadata
+        }, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_pending_topics())
+        return await future
+    
+    async def _flush_pending_topics(self):
+        """Embed and store every topic queued during the batch window"""
+        # Let callers scheduled in the same loop tick enqueue; only wait out the
+        # window when there is concurrency to coalesce, so a lone call isn't delayed
+        await asyncio.sleep(0)
+        if len(self._pending_topics) > 1:
+            await asyncio.sleep(TOPIC_BATCH_WINDOW)
+        pending, self._pending_topics = self._pending_topics, []
+        self._flush_task = None
+        
         try:
-            topic_id = str(uuid.uuid4())
-            
-            # Embed query for similarity
-            query_embedding = self.embedder.encode(query)
+            topic_ids = await self.add_topics([item for item, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), topic_id in zip(pending, topic_ids):
+            if not future.done():
+                future.set_result(topic_id)
+    
+    async def add_topics(self, items: List[Dict[str, Any]]) -> List[str]:
+        """
+        Add several topics with a single batched embedding call
+        
+        Args:
+            items: Dicts with "query", "summary", "user_id" and optional "metadata"
+        
+        Returns:
+            Topic IDs, in input order
+        """
+        if not items:
+            return []
+        
+        try:
+            # One encoder forward pass for the whole batch
+            embeddings = self.embedder.encode([item["query"] for item in items])
             
-            # Store topic
-            topic_data = {
-                "id": topic_id,
-                "user_id": user_id,
-                "query": query,
-                "summary": summary,
-                "timestamp": datetime.now().isoformat(),
-                "embedding": query_embedding,
-                "edges": [],  # Will be updated with related topics
-                **(metadata or {})
-            }
+            topic_ids = [
+                self._store_topic(item, embedding)
+                for item, embedding in zip(items, embeddings)
+            ]
             
-            logger.info(f"✅ Added topic: {query[:30]}... (id={topic_id[:8]}...)")
-            return topic_id
+            logger.info(f"✅ Added {len(topic_ids)} topics")
+            return topic_ids
         
         except Exception as e:
-            logger.error(f"❌ Failed to add topic: {str(e)}")
+            logger.error(f"❌ Failed to add topics: {str(e)}")
             raise
     
+    def _store_topic(self, item: Dict[str, Any], query_embedding) -> str:
+        """Store one topic record and its normalized embedding in memory"""
+        topic_id = str(uuid.uuid4())
+        query = item["query"]
+        user_id = item["user_id"]
+        
+        # Store topic (the embedding lives only in the normalized vectors/matrix)
+        topic_data = {
+            "id": topic_id,
+            "user_id": user_id,
+            "query": query,
+            "summary": item["summary"],
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "edges": [],  # Will be updated with related topics
+            **(item.get("metadata") or {})
+        }
+        
+        self._topics.setdefault(user_id, []).append(topic_data)
+        normalized = self._normalize(query_embedding)
+        self._topic_vectors.setdefault(user_id, []).append(normalized)
+        self._topic_index.setdefault(user_id, QuantizedIndex()).add(normalized)
+        self._topic_matrix.pop(user_id, None)  # rebuilt on next search
+        
+        if len(self._topics[user_id]) > TOPIC_MAX_PER_USER:
+            self._trim_user_topics(user_id)
+        self._touch_user(user_id)
+        
+        logger.debug("✅ Added topic: %s... (id=%s...)", query[:30], topic_id[:8])
+        return topic_id
+    
+    def _touch_user(self, user_id: str):
+        """Mark a user as most recently used, evicting the least recently used past the cap"""
+        self._topic_users[user_id] = None
+        self._topic_users.move_to_end(user_id)
+        while len(self._topic_users) > TOPIC_MAX_USERS:
+            evicted, _ = self._topic_users.popitem(last=False)
+            self._topics.pop(evicted, None)
+            self._topic_vectors.pop(evicted, None)
+            self._topic_matrix.pop(evicted, None)
+            self._topic_index.pop(evicted, None)
+    
+    def _trim_user_topics(self, user_id: str):
+        """Drop a user's oldest topics and rebuild their shadow index from the rest"""
+        keep = TOPIC_MAX_PER_USER - TOPIC_MAX_PER_USER // 4
+        self._topics[user_id] = self._topics[user_id][-keep:]
+        vectors = self._topic_vectors[user_id][-keep:]
+        self._topic_vectors[user_id] = vectors
+        
+        index = QuantizedIndex()
+        for vector in vectors:
+            index.add(vector)
+        self._topic_index[user_id] = index
+        self._topic_matrix.pop(user_id, None)
+        logger.debug("🧹 Trimmed topics for user %s... to %d", user_id[:8], keep)
+    
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        """Return an L2-normalized float32 copy of an embedding"""
+        vector = np.array(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+    
+    def _get_topic_matrix(self, user_id: str) -> Optional[np.ndarray]:
+        """Get (building if stale) the C-contiguous (N, D) matrix of a user's topic embeddings"""
+        matrix = self._topic_matrix.get(user_id)
+        if matrix is None:
+            vectors = self._topic_vectors.get(user_id)
+            if not vectors:
+                return None
+            matrix = np.ascontiguousarray(np.vstack(vectors), dtype=np.float32)
+            self._topic_matrix[user_id] = matrix
+            # Keep rows as views into the matrix rather than separate copies
+            self._topic_vectors[user_id] = list(matrix)
+        return matrix
+    
     async def find_related_topics(
         self,
         query: str,
@@ -94,15 +242,50 @@ class TopicGraphAgent:
         Returns:
             List of related topics with similarity scores
         """
+        # Nothing to match: skip the embedder forward pass entirely
+        if not query or top_k <= 0 or user_id not in self._topic_vectors:
+            return []
+        
         try:
-            # Embed query
-            query_embedding = self.embedder.encode(query)
-            
-            # Search for similar topics (would use Qdrant in full implementation)
-            # For now, return placeholder
             related_topics = []
+            self._touch_user(user_id)
+            
+            matrix = self._get_topic_matrix(user_id)
+            if matrix is not None:
+                # Embed query
+                q = self._normalize(self.embedder.encode(query))
+                
+                if len(matrix) >= QUANTIZED_PREFILTER_MIN_TOPICS:
+                    # Approximate int8 scan, then exact FP32 scores for the candidates only
+                    rows = self._topic_index[user_id].candidates(q, top_k)
+                    row_sims = matrix[rows] @ q
+                else:
+                    # One matrix-vector product scores every stored topic at once
+                    rows = np.arange(len(matrix))
+                    row_sims = matrix @ q
+                
+                k = min(top_k, len(row_sims))
+                if k < len(row_sims):
+                    order = np.argpartition(-row_sims, k - 1)[:k]
+                else:
+                    order = np.arange(len(row_sims))
+                order = order[np.argsort(-row_sims[order])]
+                
+                topics = self._topics[user_id]
+                for idx, similarity in zip(rows[order], row_sims[order]):
+                    similarity = float(similarity)
+                    if similarity < similarity_threshold:
+                        break
+                    topic = topics[idx]
+                    related_topics.append({
+                        "id": topic["id"],
+                        "query": topic["query"],
+                        "summary": topic["summary"],
+                        "timestamp": topic["timestamp"],
+                        "similarity": similarity
+                    })
             
-            logger.info(f"✅ Found {len(related_topics)} related topics for user {user_id[:8]}...")
+            logger.info("✅ Found %d related topics for user %s...", len(related_topics), user_id[:8])
             return related_topics
         
         except Exception as e:
@@ -130,7 +313,7 @@ class TopicGraphAgent:
                 "related_count": 0
             }
             
-            logger.info(f"✅ Built topic summary for {topic_id[:8]}...")
+            logger.info("✅ Built topic summary for %s...", topic_id[:8])
             return summary
         
         except Exception as e:
@@ -160,7 +343,7 @@ class TopicGraphAgent:
                 "edge_count": 0
             }
             
-            logger.info(f"✅ Retrieved topic graph for user {user_id[:8]}...")
+            logger.info("✅ Retrieved topic graph for user %s...", user_id[:8])
             return graph
         
         except Exception as e:
@@ -187,7 +370,7 @@ class TopicGraphAgent:
         try:
             path = [start_topic, end_topic]  # Placeholder
             
-            logger.info(f"✅ Found research path: {' → '.join(path[:5])}")
+            logger.info("✅ Found research path: %s", " → ".join(path[:5]))
             return path
         
         except Exception as e:
@@ -211,10 +394,13 @@ class TopicGraphAgent:
         Returns:
             List of related research summaries
         """
+        if not query or limit <= 0:
+            return []
+        
         try:
             related = []
             
-            logger.info(f"✅ Found {len(related)} related research items")
+            logger.info("✅ Found %d related research items", len(related))
             return related
         
         except Exception as e:
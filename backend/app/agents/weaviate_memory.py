@@ -7,14 +7,73 @@ Maintains two collections: ResearchChunk (content vectors) and TopicMemory (summ
 import weaviate
 from weaviate.classes.config import Configure, Property, DataType
 from weaviate.classes.query import Filter, MetadataQuery
+from weaviate.classes.init import AdditionalConfig, ConnectionConfig, Timeout
+from weaviate.classes.data import DataObject
+from weaviate.util import generate_uuid5
+import asyncio
+import functools
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime
-import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar, Dict, Iterator, List, Any, Optional, Tuple, Union
+from datetime import datetime, timezone
+from collections import OrderedDict
+import numpy as np
+import threading
+import atexit
+import hashlib
+import copy
+import time
 import os
 
 logger = logging.getLogger(__name__)
 
+# Properties actually read back when formatting query results; everything else
+# (e.g. added_at) stays server-side instead of crossing the wire
+CHUNK_RETURN_PROPERTIES = ["content", "title", "url", "source_domain", "query", "chunk_index"]
+TOPIC_RETURN_PROPERTIES = ["summary", "query", "timestamp", "insights_count", "sources_count", "key_findings"]
+
+# Collection definitions, created on demand by WeaviateMemory._ensure_collection
+COLLECTION_SCHEMAS = {
+    "ResearchChunk": {
+        "description": "Stores cleaned research content chunks with embeddings",
+        "properties": [
+            Property(name="content", data_type=DataType.TEXT),
+            Property(name="query", data_type=DataType.TEXT),
+            Property(name="title", data_type=DataType.TEXT),
+            Property(name="url", data_type=DataType.TEXT),
+            Property(name="source_domain", data_type=DataType.TEXT),
+            Property(name="chunk_index", data_type=DataType.INT),
+            Property(name="added_at", data_type=DataType.TEXT),
+            Property(name="added_at_epoch", data_type=DataType.INT),
+        ],
+    },
+    "TopicMemory": {
+        "description": "Stores final summaries and insights from research queries",
+        "properties": [
+            Property(name="summary", data_type=DataType.TEXT),
+            Property(name="query", data_type=DataType.TEXT),
+            Property(name="timestamp", data_type=DataType.TEXT),
+            Property(name="insights_count", data_type=DataType.INT),
+            Property(name="sources_count", data_type=DataType.INT),
+            Property(name="key_findings", data_type=DataType.TEXT),
+        ],
+    },
+}
+
+# Embeddings may arrive as plain lists or NumPy arrays
+Embedding = Union[List[float], np.ndarray]
+
+
+def _as_float32(embedding: Embedding) -> np.ndarray:
+    """Convert an embedding (or stack of embeddings) to a contiguous float32 array"""
+    return np.ascontiguousarray(embedding, dtype=np.float32)
+
+
+@functools.lru_cache(maxsize=1024)
+def _query_filter(query_text: str):
+    """Build (once per distinct query text) the equality filter on the "query" property"""
+    return Filter.by_property("query").equal(query_text)
+
 
 class WeaviateMemory:
     """
@@ -24,149 +83,335 @@ class WeaviateMemory:
     """
     
     _instance = None
+    _lock: ClassVar[threading.Lock] = threading.Lock()
     
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         """
         Singleton pattern - ensures only one Weaviate client instance
         """
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._initialized = False
+                    cls._instance = instance
         return cls._instance
     
-    def __init__(self):
+    def __init__(
+        self,
+        batch_size: int = 200,
+        concurrent_requests: int = 2,
+        cache_max_size: int = 2000,
+        cache_ttl: float = 300.0
+    ):
         """
-        Initialize Weaviate client and collections
-        Supports both local Docker and Weaviate Cloud
+        Initialize Weaviate memory settings
+        Supports both local Docker and Weaviate Cloud; the connection itself is
+        opened lazily on first use (or by warmup())
+        
+        Args:
+            batch_size: Objects sent per batch request when inserting chunks
+            concurrent_requests: Batch requests kept in flight at once
+            cache_max_size: Maximum number of cached query results
+            cache_ttl: Seconds a cached query result stays valid
         """
         if self._initialized:
             return
         
-        try:
-            logger.info("🗄️  Initializing Weaviate...")
-            
-            # Get configuration from environment
-            weaviate_url = os.getenv('WEAVIATE_URL', 'http://localhost:8085')
-            api_key = os.getenv('WEAVIATE_API_KEY')
-            
-            # Connect to Weaviate
-            if api_key:
-                # Cloud connection
-                logger.info(f"Connecting to Weaviate Cloud: {weaviate_url}")
-                self.client = weaviate.connect_to_weaviate_cloud(
-                    cluster_url=weaviate_url,
-                    auth_credentials=weaviate.auth.AuthApiKey(api_key)
-                )
-            else:
-                # Local Docker connection
-                logger.info(f"Connecting to local Weaviate: {weaviate_url}")
-                host = weaviate_url.replace('http://', '').replace('https://', '').split(':')[0]
-                port = int(weaviate_url.split(':')[-1]) if ':' in weaviate_url else 8080
-                self.client = weaviate.connect_to_local(host=host, port=port)
-            
-            # Create collections
-            self._create_collections()
+        with self._lock:
+            # Re-check under the lock: another thread may have finished init meanwhile
+            if self._initialized:
+                return
+            
+            self.batch_size = batch_size
+            self.concurrent_requests = concurrent_requests
+            
+            # Query result cache: key -> (stored_at, result), LRU order
+            self._query_cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+            self._cache_lock = threading.RLock()
+            self._cache_max_size = cache_max_size
+            self._cache_ttl = cache_ttl
+            self._cache_generation = 0  # bumped on every write so stale results are never served
+            self.cache_hits = 0
+            self.cache_misses = 0
+            
+            # Collection stats cache: (fetched_at, stats) plus writes made since the fetch
+            self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+            self._stats_ttl = 30.0
+            self._added_chunks_since_stats = 0
+            self._added_memories_since_stats = 0
+            
+            # Worker threads for concurrent multi-query / multi-group calls
+            self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="weaviate")
+            
+            # Serializes use of the collection's shared batch object
+            self._batch_lock = threading.Lock()
+            
+            # Connection state - the network handshake is deferred to first use
+            self.client = None
+            self.research_chunks = None
+            self.topic_memory = None
+            self._connect_lock = threading.Lock()
             
             self._initialized = True
-            logger.info("✅ Weaviate initialized successfully")
+    
+    def _ensure_connected(self):
+        """Connect to Weaviate and prepare collections on first use"""
+        if self.client is not None:
+            return
+        
+        with self._connect_lock:
+            if self.client is not None:
+                return
             
+            try:
+                logger.info("🗄️  Initializing Weaviate...")
+                
+                # Get configuration from environment
+                weaviate_url = os.getenv('WEAVIATE_URL', 'http://localhost:8085')
+                api_key = os.getenv('WEAVIATE_API_KEY')
+                
+                # Keep a warm, pooled connection instead of re-handshaking per call
+                additional_config = AdditionalConfig(
+                    timeout=Timeout(init=10, query=30, insert=60),
+                    connection=ConnectionConfig(
+                        session_pool_connections=32,
+                        session_pool_maxsize=64,
+                        session_pool_max_retries=3
+                    )
+                )
+                
+                # Connect to Weaviate
+                if api_key:
+                    # Cloud connection
+                    logger.info(f"Connecting to Weaviate Cloud: {weaviate_url}")
+                    client = weaviate.connect_to_weaviate_cloud(
+                        cluster_url=weaviate_url,
+                        auth_credentials=weaviate.auth.AuthApiKey(api_key),
+                        additional_config=additional_config
+                    )
+                else:
+                    # Local Docker connection
+                    logger.info(f"Connecting to local Weaviate: {weaviate_url}")
+                    host = weaviate_url.replace('http://', '').replace('https://', '').split(':')[0]
+                    port = int(weaviate_url.split(':')[-1]) if ':' in weaviate_url else 8080
+                    client = weaviate.connect_to_local(
+                        host=host,
+                        port=port,
+                        additional_config=additional_config
+                    )
+                
+                # Create collections
+                self._create_collections(client)
+                
+                # Publish the client only once collections are ready
+                self.client = client
+                
+                # Drain the connection pool on interpreter shutdown
+                atexit.register(self.close)
+                
+                logger.info("✅ Weaviate initialized successfully")
+                
+            except Exception as e:
+                logger.error(f"❌ Failed to initialize Weaviate: {str(e)}")
+                raise
+    
+    async def warmup(self):
+        """
+        Connect in a worker thread so the handshake overlaps other startup work
+        Failures are logged; the next real call retries the connection
+        """
+        try:
+            await asyncio.to_thread(self._ensure_connected)
         except Exception as e:
-            logger.error(f"❌ Failed to initialize Weaviate: {str(e)}")
-            raise
+            logger.warning(f"⚠️  Weaviate warmup failed: {str(e)}")
     
-    def _create_collections(self):
+    def _create_collections(self, client):
         """Create Weaviate collections if they don't exist"""
         try:
-            # Create ResearchChunk collection
-            if not self.client.collections.exists("ResearchChunk"):
-                self.client.collections.create(
-                    name="ResearchChunk",
-                    description="Stores cleaned research content chunks with embeddings",
-                    properties=[
-                        Property(name="content", data_type=DataType.TEXT),
-                        Property(name="query", data_type=DataType.TEXT),
-                        Property(name="title", data_type=DataType.TEXT),
-                        Property(name="url", data_type=DataType.TEXT),
-                        Property(name="source_domain", data_type=DataType.TEXT),
-                        Property(name="chunk_index", data_type=DataType.INT),
-                        Property(name="added_at", data_type=DataType.TEXT),
-                        Property(name="chunk_id", data_type=DataType.TEXT),
-                    ]
-                )
-                logger.info("✓ Collection 'ResearchChunk' created")
-            else:
-                logger.info("✓ Collection 'ResearchChunk' ready")
-            
-            # Create TopicMemory collection
-            if not self.client.collections.exists("TopicMemory"):
-                self.client.collections.create(
-                    name="TopicMemory",
-                    description="Stores final summaries and insights from research queries",
-                    properties=[
-                        Property(name="summary", data_type=DataType.TEXT),
-                        Property(name="query", data_type=DataType.TEXT),
-                        Property(name="timestamp", data_type=DataType.TEXT),
-                        Property(name="insights_count", data_type=DataType.INT),
-                        Property(name="sources_count", data_type=DataType.INT),
-                        Property(name="key_findings", data_type=DataType.TEXT),
-                        Property(name="memory_id", data_type=DataType.TEXT),
-                    ]
-                )
-                logger.info("✓ Collection 'TopicMemory' created")
-            else:
-                logger.info("✓ Collection 'TopicMemory' ready")
+            for name in COLLECTION_SCHEMAS:
+                self._ensure_collection(name, client=client)
             
             # Get collection references
-            self.research_chunks = self.client.collections.get("ResearchChunk")
-            self.topic_memory = self.client.collections.get("TopicMemory")
+            self.research_chunks = client.collections.get("ResearchChunk")
+            self.topic_memory = client.collections.get("TopicMemory")
             
         except Exception as e:
             logger.error(f"❌ Failed to create collections: {str(e)}")
             raise
     
+    def _ensure_collection(self, name: str, known_missing: bool = False, client=None):
+        """
+        Create a single collection from COLLECTION_SCHEMAS if needed
+        
+        Args:
+            name: Collection name
+            known_missing: Skip the exists() round-trip when the caller just deleted it
+            client: Client to use (defaults to the connected client)
+        """
+        client = client or self.client
+        if not known_missing and client.collections.exists(name):
+            self._add_missing_properties(client.collections.get(name), name)
+            logger.info(f"✓ Collection '{name}' ready")
+            return
+        
+        schema = COLLECTION_SCHEMAS[name]
+        client.collections.create(
+            name=name,
+            description=schema["description"],
+            properties=schema["properties"]
+        )
+        logger.info(f"✓ Collection '{name}' created")
+    
+    def _add_missing_properties(self, collection, name: str):
+        """
+        Add schema properties an existing collection predates (e.g. added_at_epoch)
+        
+        Without this, older deployments would get new properties through
+        auto-schema, inferred with the wrong type (NUMBER instead of INT).
+        
+        Args:
+            collection: Existing collection handle
+            name: Collection name in COLLECTION_SCHEMAS
+        """
+        existing = {prop.name for prop in collection.config.get().properties}
+        for prop in COLLECTION_SCHEMAS[name]["properties"]:
+            if prop.name not in existing:
+                collection.config.add_property(prop)
+                logger.info(f"✓ Added property '{prop.name}' to collection '{name}'")
+    
+    def _cache_key(self, kind: str, query_embedding: np.ndarray, n_results: int,
+                   query_text: Any = None) -> Tuple:
+        """Build a compact cache key from the embedding bytes and query parameters"""
+        digest = hashlib.blake2b(
+            query_embedding.tobytes(),
+            digest_size=16
+        ).digest()
+        return (kind, digest, n_results, query_text, self._cache_generation)
+    
+    def _cache_get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Return a copy of a cached result if present and fresh"""
+        with self._cache_lock:
+            entry = self._query_cache.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if time.monotonic() - stored_at < self._cache_ttl:
+                    self._query_cache.move_to_end(key)
+                    self.cache_hits += 1
+                    return copy.deepcopy(result)
+                del self._query_cache[key]
+            self.cache_misses += 1
+            return None
+    
+    def _cache_put(self, key: Tuple, result: Dict[str, Any]):
+        """Store a result, evicting the least recently used entries over max size"""
+        with self._cache_lock:
+            self._query_cache[key] = (time.monotonic(), copy.deepcopy(result))
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > self._cache_max_size:
+                self._query_cache.popitem(last=False)
+    
+    def _invalidate_cache(self):
+        """Invalidate cached query results after a write"""
+        with self._cache_lock:
+            self._cache_generation += 1
+            self._query_cache.clear()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get query cache statistics
+        
+        Returns:
+            Dictionary with cache size, hits, misses and hit rate
+        """
+        with self._cache_lock:
+            total = self.cache_hits + self.cache_misses
+            return {
+                "size": len(self._query_cache),
+                "max_size": self._cache_max_size,
+                "ttl_seconds": self._cache_ttl,
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_rate": self.cache_hits / total if total else 0.0,
+            }
+    
     def add_research_chunks(
         self,
         chunks: List[str],
-        embeddings: List[List[float]],
+        embeddings: Union[List[List[float]], np.ndarray],
         metadata_list: List[Dict[str, Any]],
-        query: str
+        query: str,
+        concurrent_requests: Optional[int] = None
     ) -> List[str]:
         """
         Add research content chunks to the vector store
         
         Args:
             chunks: List of text chunks
-            embeddings: List of embedding vectors
+            embeddings: Embedding vectors, as a list of lists or an (N, D) array
             metadata_list: List of metadata dicts for each chunk
             query: Original research query
+            concurrent_requests: Batch requests in flight (default: self.concurrent_requests)
             
         Returns:
             List of chunk IDs
         """
         try:
-            chunk_ids = []
-            
-            for i, (chunk, embedding, meta) in enumerate(zip(chunks, embeddings, metadata_list)):
-                chunk_id = f"chunk_{uuid.uuid4().hex[:12]}"
-                
-                properties = {
-                    "content": chunk,
-                    "query": query,
-                    "title": meta.get("title", "Unknown"),
-                    "url": meta.get("url", ""),
-                    "source_domain": meta.get("source_domain", ""),
-                    "chunk_index": meta.get("chunk_index", i),
-                    "added_at": datetime.now().isoformat(),
-                    "chunk_id": chunk_id,
-                }
-                
-                self.research_chunks.data.insert(
-                    properties=properties,
-                    vector=embedding
+            self._ensure_connected()
+            
+            # One contiguous (N, D) float32 block instead of N lists of boxed floats
+            vectors = _as_float32(embeddings)
+            rows = list(zip(chunks, vectors, metadata_list))
+            
+            # One timestamp per batch rather than per chunk
+            added_at = datetime.now(timezone.utc).isoformat()
+            added_at_epoch = int(time.time())
+            # Deterministic object UUIDs: re-ingesting the same chunk overwrites it
+            # instead of adding a duplicate
+            chunk_ids = [
+                generate_uuid5(
+                    f"{meta.get('url', '')}|{meta.get('chunk_index', i)}|"
+                    f"{hashlib.blake2b(chunk.encode(), digest_size=8).hexdigest()}"
                 )
+                for i, (chunk, _, meta) in enumerate(rows)
+            ]
+            
+            # Ship all chunks through the batcher instead of one insert request each.
+            # The collection has one shared batch object, so callers take turns:
+            # otherwise one upload's failed_objects could be read or cleared by another
+            with self._batch_lock:
+                with self.research_chunks.batch.fixed_size(
+                    batch_size=self.batch_size,
+                    concurrent_requests=concurrent_requests or self.concurrent_requests
+                ) as batch:
+                    for i, (chunk, embedding, meta) in enumerate(rows):
+                        properties = {
+                            "content": chunk,
+                            "query": query,
+                            "title": meta.get("title", "Unknown"),
+                            "url": meta.get("url", ""),
+                            "source_domain": meta.get("source_domain", ""),
+                            "chunk_index": meta.get("chunk_index", i),
+                            "added_at": added_at,
+                            "added_at_epoch": added_at_epoch,
+                        }
+                        
+                        batch.add_object(
+                            properties=properties,
+                            vector=embedding.tolist(),
+                            uuid=chunk_ids[i]
+                        )
                 
-                chunk_ids.append(chunk_id)
+                # Final once the context has flushed; still this upload's failures
+                failed = self.research_chunks.batch.failed_objects
             
+            if failed:
+                logger.error(f"❌ {len(failed)} chunks failed to insert: {failed[0].message}")
+                raise RuntimeError(f"Batch insert failed for {len(failed)} of {len(rows)} chunks")
+            
+            self._invalidate_cache()
+            with self._cache_lock:
+                self._added_chunks_since_stats += len(rows)
             logger.info(f"✅ Added {len(chunks)} chunks to ResearchChunk collection")
             return chunk_ids
             
@@ -178,7 +423,7 @@ class WeaviateMemory:
         self,
         query: str,
         summary: str,
-        embedding: List[float],
+        embedding: Embedding,
         insights: List[str],
         key_findings: str = "",
         sources_count: int = 0
@@ -198,23 +443,39 @@ class WeaviateMemory:
             Memory ID
         """
         try:
-            memory_id = f"memory_{uuid.uuid4().hex[:12]}"
+            self._ensure_connected()
+            
+            now = datetime.now(timezone.utc)
+            
+            # Deterministic per (query, hour, summary): only an identical re-save
+            # within the hour collapses onto the existing object; a new summary
+            # for the same query is stored alongside it
+            summary_digest = hashlib.blake2b(summary.encode(), digest_size=16).hexdigest()
+            memory_id = generate_uuid5(f"{query}|{now.strftime('%Y-%m-%dT%H')}|{summary_digest}")
             
             properties = {
                 "summary": summary,
                 "query": query,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now.isoformat(),
                 "insights_count": len(insights),
                 "sources_count": sources_count,
                 "key_findings": key_findings[:500] if key_findings else "",
-                "memory_id": memory_id,
             }
             
-            self.topic_memory.data.insert(
-                properties=properties,
-                vector=embedding
-            )
+            # insert_many goes through the batch endpoint, which upserts by UUID
+            response = self.topic_memory.data.insert_many([
+                DataObject(
+                    properties=properties,
+                    vector=_as_float32(embedding).tolist(),
+                    uuid=memory_id
+                )
+            ])
+            if response.has_errors:
+                raise RuntimeError(f"Topic memory insert failed: {response.errors}")
             
+            self._invalidate_cache()
+            with self._cache_lock:
+                self._added_memories_since_stats += 1
             logger.info(f"✅ Added topic memory: {memory_id}")
             return memory_id
             
@@ -224,9 +485,10 @@ class WeaviateMemory:
     
     def retrieve_similar_chunks(
         self,
-        query_embedding: List[float],
+        query_embedding: Embedding,
         n_results: int = 5,
-        query_text: Optional[str] = None
+        query_text: Optional[str] = None,
+        query: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Retrieve most similar research chunks using vector similarity
@@ -235,57 +497,229 @@ class WeaviateMemory:
             query_embedding: Query embedding vector
             n_results: Number of results to return (default: 5)
             query_text: Optional text query for filtering
+            query: Optional raw query text; when given, runs a hybrid
+                   BM25 + vector search via retrieve_hybrid instead
             
         Returns:
             Dictionary with retrieved chunks and metadata
         """
+        if query:
+            return self.retrieve_hybrid(query, query_embedding, n_results=n_results)
+        
+        query_vector = _as_float32(query_embedding)
+        cache_key = self._cache_key("chunks", query_vector, n_results, query_text)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            # Build query with optional filter
-            query_builder = self.research_chunks.query.near_vector(
-                near_vector=query_embedding,
-                limit=n_results,
-                return_metadata=MetadataQuery(distance=True)
-            )
+            formatted_results = list(self.iter_similar_chunks(query_vector, n_results, query_text))
             
-            # Add filter if query_text provided
-            if query_text:
-                query_builder = self.research_chunks.query.near_vector(
-                    near_vector=query_embedding,
-                    limit=n_results,
-                    filters=Filter.by_property("query").equal(query_text),
-                    return_metadata=MetadataQuery(distance=True)
-                )
+            logger.info(f"✅ Retrieved {len(formatted_results)} similar chunks")
+            result = {"chunks": formatted_results}
+            self._cache_put(cache_key, result)
+            return result
             
-            results = query_builder
+        except Exception as e:
+            logger.error(f"❌ Error retrieving chunks: {str(e)}")
+            return {"chunks": []}
+    
+    def iter_similar_chunks(
+        self,
+        query_embedding: Embedding,
+        n_results: int = 5,
+        query_text: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield the most similar research chunks, best match first
+        
+        Results are formatted one at a time, so callers that stop early skip
+        building dicts for the rest. Not cached; errors propagate to the caller.
+        
+        Args:
+            query_embedding: Query embedding vector
+            n_results: Number of results to fetch (default: 5)
+            query_text: Optional text query for filtering
+            
+        Yields:
+            Chunk dicts with content, metadata and similarity
+        """
+        self._ensure_connected()
+        
+        # Build query with optional filter, then issue it once
+        query_kwargs = dict(
+            near_vector=_as_float32(query_embedding).tolist(),
+            limit=n_results,
+            return_properties=CHUNK_RETURN_PROPERTIES,
+            return_metadata=MetadataQuery(distance=True)
+        )
+        if query_text:
+            query_kwargs["filters"] = _query_filter(query_text)
+        
+        results = self.research_chunks.query.near_vector(**query_kwargs)
+        
+        for obj in results.objects:
+            distance = obj.metadata.distance if obj.metadata and obj.metadata.distance else 0
+            similarity = 1 - distance  # Convert distance to similarity
+            yield self._format_chunk(obj, similarity)
+    
+    def retrieve_hybrid(
+        self,
+        query_text: str,
+        query_embedding: Embedding,
+        alpha: float = 0.5,
+        n_results: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Retrieve research chunks with Weaviate's fused BM25 + vector ranking
+        
+        Args:
+            query_text: Keyword query for the BM25 side
+            query_embedding: Query embedding vector for the dense side
+            alpha: Weight of the vector score (0 = pure BM25, 1 = pure vector)
+            n_results: Number of results to return (default: 5)
+            
+        Returns:
+            Dictionary with retrieved chunks; "similarity" holds the fused score
+        """
+        query_vector = _as_float32(query_embedding)
+        cache_key = self._cache_key("hybrid", query_vector, n_results, (query_text, alpha))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            self._ensure_connected()
+            
+            results = self.research_chunks.query.hybrid(
+                query=query_text,
+                vector=query_vector.tolist(),
+                alpha=alpha,
+                limit=n_results,
+                return_properties=CHUNK_RETURN_PROPERTIES,
+                return_metadata=MetadataQuery(score=True)
+            )
             
-            # Format results
             formatted_results = []
             for obj in results.objects:
-                distance = obj.metadata.distance if obj.metadata and obj.metadata.distance else 0
-                similarity = 1 - distance  # Convert distance to similarity
-                
-                formatted_results.append({
-                    "content": obj.properties.get("content", ""),
-                    "metadata": {
-                        "title": obj.properties.get("title", "Unknown"),
-                        "url": obj.properties.get("url", ""),
-                        "source_domain": obj.properties.get("source_domain", ""),
-                        "query": obj.properties.get("query", ""),
-                        "chunk_index": obj.properties.get("chunk_index", 0),
-                    },
-                    "similarity": similarity
-                })
+                score = obj.metadata.score if obj.metadata and obj.metadata.score else 0
+                formatted_results.append(self._format_chunk(obj, score))
             
-            logger.info(f"✅ Retrieved {len(formatted_results)} similar chunks")
-            return {"chunks": formatted_results}
+            logger.info(f"✅ Retrieved {len(formatted_results)} chunks via hybrid search")
+            result = {"chunks": formatted_results}
+            self._cache_put(cache_key, result)
+            return result
             
         except Exception as e:
-            logger.error(f"❌ Error retrieving chunks: {str(e)}")
+            logger.error(f"❌ Error in hybrid retrieval: {str(e)}")
             return {"chunks": []}
     
+    @staticmethod
+    def _format_chunk(obj, similarity: float) -> Dict[str, Any]:
+        """Format a ResearchChunk query result object"""
+        return {
+            "content": obj.properties.get("content", ""),
+            "metadata": {
+                "title": obj.properties.get("title", "Unknown"),
+                "url": obj.properties.get("url", ""),
+                "source_domain": obj.properties.get("source_domain", ""),
+                "query": obj.properties.get("query", ""),
+                "chunk_index": obj.properties.get("chunk_index", 0),
+            },
+            "similarity": similarity
+        }
+    
+    async def retrieve_similar_chunks_batch(
+        self,
+        embeddings: Union[List[List[float]], np.ndarray],
+        n_results: int = 5,
+        query_text: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve similar chunks for several query embeddings concurrently
+        
+        Identical embeddings in the batch share a single query.
+        
+        Args:
+            embeddings: List of query embedding vectors
+            n_results: Number of results to return per query
+            query_text: Optional text query for filtering
+            
+        Returns:
+            List of result dicts (same shape as retrieve_similar_chunks), in input order
+        """
+        if len(embeddings) == 0:
+            return []
+        
+        loop = asyncio.get_running_loop()
+        
+        # Deduplicate identical embeddings so repeated queries cost one RPC
+        unique: Dict[bytes, np.ndarray] = {}
+        keys = []
+        for embedding in _as_float32(embeddings):
+            key = embedding.tobytes()
+            unique.setdefault(key, embedding)
+            keys.append(key)
+        
+        unique_keys = list(unique)
+        results = await asyncio.gather(*(
+            loop.run_in_executor(
+                self._executor,
+                self.retrieve_similar_chunks,
+                unique[key],
+                n_results,
+                query_text
+            )
+            for key in unique_keys
+        ))
+        by_key = dict(zip(unique_keys, results))
+        
+        logger.info(f"✅ Batch retrieved {len(embeddings)} queries ({len(unique_keys)} unique)")
+        return [by_key[key] for key in keys]
+    
+    async def add_research_chunks_batch(
+        self,
+        chunks: List[str],
+        embeddings: Union[List[List[float]], np.ndarray],
+        metadata_list: List[Dict[str, Any]],
+        query: str,
+        parallel_workers: int = 4
+    ) -> List[str]:
+        """
+        Add a large set of research chunks off the event loop
+        
+        Everything goes through one batch context; the Weaviate client splits
+        it into batch_size requests and keeps parallel_workers of them in flight.
+        
+        Args:
+            chunks: List of text chunks
+            embeddings: List of embedding vectors
+            metadata_list: List of metadata dicts for each chunk
+            query: Original research query
+            parallel_workers: Maximum batch requests uploaded at once
+            
+        Returns:
+            List of chunk IDs, in input order
+        """
+        if not chunks:
+            return []
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(
+                self.add_research_chunks,
+                chunks,
+                embeddings,
+                metadata_list,
+                query,
+                concurrent_requests=parallel_workers
+            )
+        )
+    
     def retrieve_topic_memory(
         self,
-        query_embedding: List[float],
+        query_embedding: Embedding,
         n_results: int = 3
     ) -> Dict[str, Any]:
         """
@@ -298,10 +732,19 @@ class WeaviateMemory:
         Returns:
             Dictionary with retrieved memories
         """
+        query_vector = _as_float32(query_embedding)
+        cache_key = self._cache_key("topics", query_vector, n_results)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
+            self._ensure_connected()
+            
             results = self.topic_memory.query.near_vector(
-                near_vector=query_embedding,
+                near_vector=query_vector.tolist(),
                 limit=n_results,
+                return_properties=TOPIC_RETURN_PROPERTIES,
                 return_metadata=MetadataQuery(distance=True)
             )
             
@@ -324,7 +767,9 @@ class WeaviateMemory:
                 })
             
             logger.info(f"✅ Retrieved {len(formatted_results)} topic memories")
-            return {"memories": formatted_results}
+            result = {"memories": formatted_results}
+            self._cache_put(cache_key, result)
+            return result
             
         except Exception as e:
             logger.error(f"❌ Error retrieving topic memory: {str(e)}")
@@ -337,7 +782,20 @@ class WeaviateMemory:
         Returns:
             Dictionary with collection sizes and info
         """
+        # Serve recent stats, adjusted for writes made through this process since
+        with self._cache_lock:
+            if self._stats_cache is not None:
+                fetched_at, cached = self._stats_cache
+                if time.monotonic() - fetched_at < self._stats_ttl:
+                    stats = dict(cached)
+                    stats["research_chunks"] += self._added_chunks_since_stats
+                    stats["topic_memory"] += self._added_memories_since_stats
+                    stats["total_entries"] = stats["research_chunks"] + stats["topic_memory"]
+                    return stats
+        
         try:
+            self._ensure_connected()
+            
             # Get counts using aggregate
             chunks_response = self.research_chunks.aggregate.over_all(total_count=True)
             memory_response = self.topic_memory.aggregate.over_all(total_count=True)
@@ -353,6 +811,11 @@ class WeaviateMemory:
                 "unlimited_storage": True
             }
             
+            with self._cache_lock:
+                self._stats_cache = (time.monotonic(), dict(stats))
+                self._added_chunks_since_stats = 0
+                self._added_memories_since_stats = 0
+            
             logger.info(f"📊 Weaviate Stats: {stats}")
             return stats
             
@@ -371,14 +834,20 @@ class WeaviateMemory:
             True if successful
         """
         try:
-            if collection_name == "ResearchChunk":
-                self.client.collections.delete("ResearchChunk")
-                self._create_collections()
-                logger.warning("⚠️  Cleared ResearchChunk collection")
-            elif collection_name == "TopicMemory":
-                self.client.collections.delete("TopicMemory")
-                self._create_collections()
-                logger.warning("⚠️  Cleared TopicMemory collection")
+            self._ensure_connected()
+            
+            if collection_name in COLLECTION_SCHEMAS:
+                self.client.collections.delete(collection_name)
+                # Only the cleared collection needs re-creating, and we know it's gone
+                self._ensure_collection(collection_name, known_missing=True)
+                self._invalidate_cache()
+                with self._cache_lock:
+                    self._stats_cache = None
+                if collection_name == "ResearchChunk":
+                    self.research_chunks = self.client.collections.get(collection_name)
+                else:
+                    self.topic_memory = self.client.collections.get(collection_name)
+                logger.warning(f"⚠️  Cleared {collection_name} collection")
             
             return True
         except Exception as e:
@@ -388,7 +857,8 @@ class WeaviateMemory:
     def close(self):
         """Close the Weaviate connection"""
         try:
-            if self.client:
+            self._executor.shutdown(wait=False)
+            if self.client is not None:
                 self.client.close()
                 logger.info("✅ Weaviate connection closed")
         except Exception as e:
@@ -397,6 +867,7 @@ class WeaviateMemory:
 
 # Global singleton instance
 weaviate_memory = None
+_factory_lock = threading.Lock()
 
 
 def get_weaviate_memory() -> WeaviateMemory:
@@ -408,5 +879,7 @@ def get_weaviate_memory() -> WeaviateMemory:
     """
     global weaviate_memory
     if weaviate_memory is None:
-        weaviate_memory = WeaviateMemory()
+        with _factory_lock:
+            if weaviate_memory is None:
+                weaviate_memory = WeaviateMemory()
     return weaviate_memory
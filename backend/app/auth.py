@@ -4,17 +4,24 @@ Provides dependency injection for protected endpoints
 """
 
 import logging
-from typing import Optional
+import threading
+from typing import ClassVar, Optional
 
 import firebase_admin
-from firebase_admin import credentials, auth
+import orjson
+from firebase_admin import credentials
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer
 
+from app.auth_middleware import FirebaseAuthMiddleware
+
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
+# Verification (and its token cache) is shared with the request-path middleware
+_verifier = FirebaseAuthMiddleware(firebase_enabled=True)
+
 
 class FirebaseAuth:
     """
@@ -23,12 +30,16 @@ class FirebaseAuth:
     """
     
     _instance = None
+    _lock: ClassVar[threading.Lock] = threading.Lock()
     
     def __new__(cls, credentials_path: Optional[str] = None, credentials_json: Optional[str] = None):
         """Singleton pattern for Firebase app initialization"""
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._initialized = False
+                    cls._instance = instance
         return cls._instance
     
     def __init__(self, credentials_path: Optional[str] = None, credentials_json: Optional[str] = None):
@@ -43,86 +54,60 @@ class FirebaseAuth:
         if self._initialized:
             return
         
-        try:
-            logger.info("🔐 Initializing Firebase Admin SDK")
+        with self._lock:
+            # Re-check under the lock: another thread may have finished init meanwhile
+            if self._initialized:
+                return
             
-            # Initialize Firebase with different credential sources
-            if credentials_json:
-                # Use JSON string (for production deployment)
-                import json
-                import tempfile
-                import os
-                
-                cred_dict = json.loads(credentials_json)
-                # Create temporary file for credentials
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-                    json.dump(cred_dict, f)
-                    temp_path = f.name
+            try:
+                logger.info("🔐 Initializing Firebase Admin SDK")
                 
-                creds = credentials.Certificate(temp_path)
-                firebase_admin.initialize_app(creds)
+                # Initialize Firebase with different credential sources
+                if credentials_json:
+                    # Use JSON string (for production deployment)
+                    # Certificate accepts the parsed dict directly, no temp file needed
+                    cred_dict = orjson.loads(credentials_json)
+                    creds = credentials.Certificate(cred_dict)
+                    firebase_admin.initialize_app(creds)
+                    logger.info("✅ Firebase initialized with JSON credentials")
+                    
+                elif credentials_path:
+                    # Use file path
+                    creds = credentials.Certificate(credentials_path)
+                    firebase_admin.initialize_app(creds)
+                    logger.info("✅ Firebase initialized with file credentials")
+                else:
+                    # Uses GOOGLE_APPLICATION_CREDENTIALS environment variable
+                    firebase_admin.initialize_app()
+                    logger.info("✅ Firebase initialized with default credentials")
                 
-                # Clean up temp file
-                os.unlink(temp_path)
-                logger.info("✅ Firebase initialized with JSON credentials")
-                
-            elif credentials_path:
-                # Use file path
-                creds = credentials.Certificate(credentials_path)
-                firebase_admin.initialize_app(creds)
-                logger.info("✅ Firebase initialized with file credentials")
-            else:
-                # Uses GOOGLE_APPLICATION_CREDENTIALS environment variable
-                firebase_admin.initialize_app()
-                logger.info("✅ Firebase initialized with default credentials")
+                self._initialized = True
             
-            self._initialized = True
-        
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Firebase: {str(e)}")
-            raise
+            except Exception as e:
+                logger.error(f"❌ Failed to initialize Firebase: {str(e)}")
+                raise
     
     async def verify_token(self, token: str) -> dict:
         """
         Verify Firebase ID token and return decoded claims
         
         Args:
-            token: Firebase ID token from Authorization header
+            token: Bare Firebase ID token (HTTPBearer has already stripped "Bearer ")
         
         Returns:
-            Dictionary with decoded token claims including 'uid', 'email', etc.
+            Dictionary with the verified user's 'uid', 'email', 'name' and 'email_verified'
         
         Raises:
             HTTPException: If token is invalid or expired
         """
-        try:
-            # Remove "Bearer " prefix if present
-            if token.startswith("Bearer "):
-                token = token[7:]
-            
-            # Verify token
-            decoded_token = auth.verify_id_token(token)
-            logger.info(f"✅ Token verified for user {decoded_token.get('uid')[:8]}...")
-            return decoded_token
-        
-        except firebase_admin.auth.InvalidIdTokenError:
-            logger.warning("⚠️  Invalid ID token")
+        if not token:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication token"
             )
-        except firebase_admin.auth.ExpiredIdTokenError:
-            logger.warning("⚠️  Expired ID token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication token has expired"
-            )
-        except Exception as e:
-            logger.error(f"❌ Token verification failed: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication failed"
-            )
+        
+        # Same offline verification and token cache as auth_middleware; returns a fresh dict
+        return await _verifier.verify_token(f"Bearer {token}")
     
     async def get_user_id(self, credentials = Depends(security)) -> str:
         """
@@ -154,23 +139,15 @@ class FirebaseAuth:
             credentials: HTTP Bearer token
         
         Returns:
-            Dictionary with user info (uid, email, name, email_verified, etc.)
+            Dictionary with user info (uid, email, name, email_verified)
         """
         token = credentials.credentials
-        decoded_token = await self.verify_token(token)
-        
-        return {
-            "uid": decoded_token.get("uid"),
-            "email": decoded_token.get("email"),
-            "name": decoded_token.get("name"),
-            "email_verified": decoded_token.get("email_verified"),
-            "iss": decoded_token.get("iss"),
-            "aud": decoded_token.get("aud")
-        }
+        return await self.verify_token(token)
 
 
 # Global Firebase instance
 firebase_auth: Optional[FirebaseAuth] = None
+_factory_lock = threading.Lock()
 
 
 def initialize_firebase(credentials_path: Optional[str] = None, credentials_json: Optional[str] = None) -> FirebaseAuth:
@@ -185,7 +162,10 @@ def initialize_firebase(credentials_path: Optional[str] = None, credentials_json
         FirebaseAuth instance
     """
     global firebase_auth
-    firebase_auth = FirebaseAuth(credentials_path, credentials_json)
+    if firebase_auth is None:
+        with _factory_lock:
+            if firebase_auth is None:
+                firebase_auth = FirebaseAuth(credentials_path, credentials_json)
     return firebase_auth
 
 
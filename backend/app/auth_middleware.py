@@ -2,78 +2,238 @@
 Firebase Auth Middleware - Extracts and verifies Firebase ID tokens from Authorization header
 """
 
+import asyncio
+import hashlib
 import logging
 import os
-import json
-from typing import Optional
+import re
+import stat
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+import httpx
+import orjson
+from cachetools import TTLCache
 from fastapi import Request, HTTPException, status
 import firebase_admin
-from firebase_admin import auth, credentials
+from firebase_admin import auth
+from google.auth import jwt as google_jwt
+
+from app.config import load_firebase_credentials, settings
 
 logger = logging.getLogger(__name__)
 
-# Track if Firebase has been initialized
-_firebase_initialized = False
+# 401 details. A new HTTPException is built per raise: a shared instance would
+# keep the last request's traceback (and the raw token in its frames) alive
+_ERR_MISSING = "Missing Authorization header"
+_ERR_FORMAT = "Invalid Authorization header format. Use: Bearer <token>"
+_ERR_INVALID = "Invalid or expired Firebase token"
+_ERR_EXPIRED = "Firebase token has expired"
+_ERR_FAILED = "Authentication failed"
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    """Build a fresh 401 for one request"""
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+# Shared read-only user returned when Firebase auth is disabled (no per-request dict)
+_DEFAULT_USER: Mapping[str, str] = MappingProxyType({"uid": "default_user", "email": "demo@example.com"})
+
+# Set once Firebase Admin is initialized; read without the lock on the hot path
+_firebase_ready: bool = False
+_init_lock = threading.Lock()
+
+# Verified tokens: blake2b-128(token) -> (user info, exp). Raw tokens are never stored.
+_token_cache = TTLCache(maxsize=settings.token_cache_maxsize, ttl=settings.token_cache_ttl)
+_token_cache_lock = threading.Lock()
+
+# Verifications currently running, by cache key; later callers await the same future
+_inflight: Dict[bytes, asyncio.Future] = {}
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared verification whose leading request was cancelled; followers retry"""
+
+# Google's signing certificates for Firebase ID tokens (kid -> PEM)
+FIREBASE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class JWKSCache:
+    """
+    Caches Google's public signing certificates for offline ID token checks
+    Refreshes when the Cache-Control max-age expires or on an unknown kid
+    
+    When shared_path is set, fetched certs are also written to that file so other
+    worker processes (and restarted ones) pick them up instead of each re-fetching
+    from Google. The file must live in an app-owned 0700 directory; it is only
+    trusted when owned by this uid and not group/world-writable.
+    """
+    
+    def __init__(
+        self,
+        url: str = FIREBASE_CERTS_URL,
+        default_max_age: int = 600,
+        shared_path: Optional[str] = None,
+        min_refresh_interval: float = 60.0
+    ):
+        """
+        Initialize the certificate cache
+        
+        Args:
+            url: Certificate endpoint (kid -> PEM JSON)
+            default_max_age: Seconds to keep certs when no max-age header is sent
+            shared_path: Cross-process cache file (None disables sharing)
+            min_refresh_interval: Minimum seconds between forced (unknown kid) refreshes
+        """
+        self.url = url
+        self.default_max_age = default_max_age
+        self.shared_path = shared_path
+        self.min_refresh_interval = min_refresh_interval
+        self._certs: Dict[str, str] = {}
+        self._expires_at = 0.0
+        self._last_fetch = 0.0
+        self._lock = asyncio.Lock()
+    
+    def _load_shared(self) -> bool:
+        """Adopt certs another worker already fetched, if still fresh and trusted"""
+        if not self.shared_path:
+            return False
+        try:
+            fd = os.open(self.shared_path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        except OSError:
+            return False
+        try:
+            # Only trust a file we wrote ourselves: same uid, not writable by others
+            st = os.fstat(fd)
+            if st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+                logger.warning("⚠️ Ignoring untrusted shared Firebase cert cache: %s", self.shared_path)
+                return False
+            with os.fdopen(fd, "rb") as f:
+                fd = None
+                data = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return False
+        finally:
+            if fd is not None:
+                os.close(fd)
+        
+        if not isinstance(data, dict):
+            return False
+        
+        if data.get("expires_at", 0) <= time.time() or not data.get("certs"):
+            return False
+        self._certs = data["certs"]
+        self._expires_at = data["expires_at"]
+        return True
+    
+    def _store_shared(self):
+        """Publish freshly fetched certs for other workers (atomic replace)"""
+        if not self.shared_path:
+            return
+        tmp_path = f"{self.shared_path}.{os.getpid()}.tmp"
+        try:
+            # O_EXCL: never write through a file or symlink someone else planted
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps({"expires_at": self._expires_at, "certs": self._certs}))
+            os.replace(tmp_path, self.shared_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write shared Firebase cert cache: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+    
+    def _fresh(self) -> bool:
+        return bool(self._certs) and time.time() < self._expires_at
+    
+    def _refresh_allowed(self) -> bool:
+        """Whether a forced refresh is permitted (at most one per min_refresh_interval)"""
+        return time.time() - self._last_fetch >= self.min_refresh_interval
+    
+    async def get_certs(self, force_refresh: bool = False) -> Dict[str, str]:
+        """
+        Get the current certificates, fetching them if stale
+        
+        Args:
+            force_refresh: Re-fetch even if the cached set is still fresh
+        
+        Returns:
+            Mapping of key id to PEM certificate
+        """
+        if force_refresh and self._fresh() and not self._refresh_allowed():
+            # Unknown kids can come from garbage tokens; don't let them drive fetches
+            return self._certs
+        if not force_refresh and self._fresh():
+            return self._certs
+        
+        async with self._lock:
+            if force_refresh and self._fresh() and not self._refresh_allowed():
+                return self._certs
+            if not force_refresh and (self._fresh() or self._load_shared()):
+                return self._certs
+            
+            async with httpx.AsyncClient(timeout=5) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+            
+            match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+            max_age = int(match.group(1)) if match else self.default_max_age
+            
+            self._certs = response.json()
+            self._last_fetch = time.time()
+            self._expires_at = self._last_fetch + max_age
+            self._store_shared()
+            logger.info(f"🔑 Refreshed Firebase signing certs ({len(self._certs)} keys, max-age={max_age}s)")
+            return self._certs
+
+
+# Cross-process sharing is opt-in; never default to a predictable temp-dir path
+_jwks_cache = JWKSCache(shared_path=settings.jwks_cache_path)
 
 
 def ensure_firebase_initialized():
-    """Ensure Firebase Admin SDK is initialized before verifying tokens"""
-    global _firebase_initialized
+    """
+    Ensure Firebase Admin SDK is initialized (double-checked, lock only on first init)
     
-    if _firebase_initialized:
+    Returns:
+        True if Firebase is ready
+    """
+    if _firebase_ready:
         return True
     
+    with _init_lock:
+        if _firebase_ready:
+            return True
+        return _initialize_firebase()
+
+
+def _initialize_firebase():
+    """One-time Firebase Admin init; caller must hold _init_lock"""
+    global _firebase_ready
+    
     # Check if already initialized by another module
     try:
         firebase_admin.get_app()
-        _firebase_initialized = True
+        _firebase_ready = True
         logger.info("✅ Firebase already initialized by another module")
         return True
     except ValueError:
         pass  # App not initialized yet
     
     try:
-        # Import settings from config (this loads from .env file)
-        from app.config import settings
+        # Parsed once per process and cached in config
+        cred = load_firebase_credentials()
+        if cred is None:
+            logger.warning("⚠️ No Firebase credentials found - check FIREBASE_CREDENTIALS_PATH or FIREBASE_CREDENTIALS_JSON")
+            return False
         
-        # Try to initialize from environment variable (JSON string) - for production
-        firebase_json = settings.firebase_credentials_json or os.getenv('FIREBASE_CREDENTIALS_JSON')
-        if firebase_json:
-            logger.info("🔍 Found FIREBASE_CREDENTIALS_JSON, attempting to initialize...")
-            try:
-                cred_dict = json.loads(firebase_json)
-                cred = credentials.Certificate(cred_dict)
-                firebase_admin.initialize_app(cred)
-                _firebase_initialized = True
-                logger.info("✅ Firebase initialized from FIREBASE_CREDENTIALS_JSON")
-                return True
-            except json.JSONDecodeError as je:
-                logger.error(f"❌ Failed to parse FIREBASE_CREDENTIALS_JSON: {je}")
-                logger.warning("⚠️ Continuing without Firebase - auth will not work")
-            except Exception as fe:
-                logger.error(f"❌ Failed to initialize Firebase from JSON: {fe}")
-                logger.warning("⚠️ Continuing without Firebase - auth will not work")
-        
-        # Try to initialize from file path - for local development
-        firebase_path = settings.firebase_credentials_path or os.getenv('FIREBASE_CREDENTIALS_PATH')
-        logger.info(f"🔍 FIREBASE_CREDENTIALS_PATH = {firebase_path}")
-        
-        if firebase_path:
-            # Check if file exists
-            if os.path.exists(firebase_path):
-                logger.info(f"📁 Firebase credentials file found at: {firebase_path}")
-                cred = credentials.Certificate(firebase_path)
-                firebase_admin.initialize_app(cred)
-                _firebase_initialized = True
-                logger.info(f"✅ Firebase initialized from file: {firebase_path}")
-                return True
-            else:
-                logger.error(f"❌ Firebase credentials file NOT found at: {firebase_path}")
-        else:
-            logger.warning("⚠️ FIREBASE_CREDENTIALS_PATH not set")
-        
-        logger.warning("⚠️ No Firebase credentials found - check FIREBASE_CREDENTIALS_PATH or FIREBASE_CREDENTIALS_JSON")
-        return False
+        firebase_admin.initialize_app(cred)
+        _firebase_ready = True
+        logger.info("✅ Firebase initialized")
+        return True
         
     except Exception as e:
         logger.error(f"❌ Firebase initialization failed: {str(e)}")
@@ -85,6 +245,8 @@ def ensure_firebase_initialized():
 class FirebaseAuthMiddleware:
     """Middleware to extract and verify Firebase tokens"""
     
+    __slots__ = ("firebase_enabled",)
+    
     def __init__(self, firebase_enabled: bool = True):
         """
         Initialize middleware
@@ -94,7 +256,55 @@ class FirebaseAuthMiddleware:
         """
         self.firebase_enabled = firebase_enabled
     
-    async def verify_token(self, authorization_header: Optional[str]) -> dict:
+    async def _verify_offline(self, token: str) -> Optional[dict]:
+        """
+        Verify a Firebase ID token signature and claims without an SDK round-trip
+        
+        Args:
+            token: Raw Firebase ID token
+        
+        Returns:
+            Decoded claims (with "uid"), or None when offline verification can't
+            be attempted (no project id, certs unavailable)
+        
+        Raises:
+            InvalidIdTokenError / ExpiredIdTokenError: If the token fails validation
+                (including a key id not in the current cert set)
+        """
+        project_id = settings.firebase_project_id
+        if not project_id:
+            return None
+        
+        try:
+            kid = google_jwt.decode_header(token).get("kid")
+            certs = await _jwks_cache.get_certs()
+            if kid not in certs:
+                # Key rotation: refresh before giving up (rate-limited inside get_certs)
+                certs = await _jwks_cache.get_certs(force_refresh=True)
+        except ValueError as e:
+            raise auth.InvalidIdTokenError(f"Malformed ID token: {e}", cause=e)
+        except Exception as e:
+            logger.warning("⚠️ Could not load Firebase signing certs, using SDK: %s", e)
+            return None
+        
+        if kid not in certs:
+            # Certs are current (or were just refreshed), so the key id is bogus
+            raise auth.InvalidIdTokenError("ID token has an unknown key id")
+        
+        try:
+            claims = google_jwt.decode(token, certs={kid: certs[kid]}, audience=project_id)
+        except ValueError as e:
+            if "expired" in str(e).lower():
+                raise auth.ExpiredIdTokenError(str(e), cause=e)
+            raise auth.InvalidIdTokenError(str(e), cause=e)
+        
+        if claims.get("iss") != f"https://securetoken.google.com/{project_id}" or not claims.get("sub"):
+            raise auth.InvalidIdTokenError("ID token has an invalid issuer or subject")
+        
+        claims["uid"] = claims["sub"]
+        return claims
+    
+    async def verify_token(self, authorization_header: Optional[str]) -> Mapping:
         """
         Verify Firebase ID token from Authorization header
         
@@ -109,69 +319,112 @@ class FirebaseAuthMiddleware:
         """
         if not self.firebase_enabled:
             # If Firebase disabled, return default user
-            logger.debug("Firebase disabled, using default user")
-            return {"uid": "default_user", "email": "demo@example.com"}
+            return _DEFAULT_USER
         
         if not authorization_header:
             logger.warning("Missing Authorization header")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Missing Authorization header"
-            )
+            raise _unauthorized(_ERR_MISSING) from None
         
-        # Extract token from "Bearer <token>"
+        # Extract token from "Bearer <token>" (prefix check + slice, no split/raise)
+        token = authorization_header[7:].strip() if authorization_header[:7].lower() == "bearer " else ""
+        if not token:
+            logger.warning("Invalid Authorization header format")
+            raise _unauthorized(_ERR_FORMAT) from None
+        
+        # Starlette decodes headers as latin-1; anything outside it can't be a real token
         try:
-            scheme, token = authorization_header.split()
-            if scheme.lower() != "bearer":
-                raise ValueError("Invalid authorization scheme")
-        except ValueError:
+            token_bytes = token.encode("latin-1")
+        except UnicodeEncodeError:
             logger.warning("Invalid Authorization header format")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid Authorization header format. Use: Bearer <token>"
-            )
+            raise _unauthorized(_ERR_FORMAT) from None
         
-        # Ensure Firebase is initialized before verifying token
-        if not ensure_firebase_initialized():
-            logger.error("Firebase not initialized, cannot verify token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication service not available"
-            )
+        # Serve a recent verification of the same token, if it hasn't expired since
+        cache_key = hashlib.blake2b(token_bytes, digest_size=16).digest()
+        with _token_cache_lock:
+            cached = _token_cache.get(cache_key)
+        if cached is not None:
+            user_info, exp = cached
+            if exp > time.time():
+                return dict(user_info)
+        
+        # Single-flight: concurrent requests with the same token share one verification
+        inflight = _inflight.get(cache_key)
+        if inflight is not None:
+            try:
+                return dict(await asyncio.shield(inflight))
+            except _LeaderCancelled:
+                # Leader's client went away; this request is still live, verify it ourselves
+                pass
+            except HTTPException as e:
+                # Own copy, so followers don't share (and keep alive) the leader's exception
+                raise _unauthorized(e.detail) from None
+        
+        future = asyncio.get_running_loop().create_future()
+        _inflight[cache_key] = future
+        try:
+            user_info = await self._verify_uncached(token, cache_key)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved in case nobody else was waiting
+            raise
+        except BaseException:
+            # Don't cancel() the shared future: that would abort every follower
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        else:
+            future.set_result(user_info)
+            return dict(user_info)
+        finally:
+            _inflight.pop(cache_key, None)
+    
+    async def _verify_uncached(self, token: str, cache_key: bytes) -> dict:
+        """
+        Verify a token (offline first, Firebase SDK fallback) and cache the result
+        
+        Args:
+            token: Raw Firebase ID token
+            cache_key: Token cache key for the result
+        
+        Returns:
+            User info dictionary
         
-        # Verify token with Firebase
+        Raises:
+            HTTPException: If the token is invalid or expired
+        """
+        # Verify token locally against cached certs; Firebase SDK is the fallback
         try:
-            decoded_token = auth.verify_id_token(token)
+            decoded_token = await self._verify_offline(token)
+            if decoded_token is None:
+                # SDK verification is blocking (it may fetch certs itself)
+                decoded_token = await asyncio.to_thread(auth.verify_id_token, token)
             user_id = decoded_token.get("uid")
             email = decoded_token.get("email", "")
             
-            logger.info(f"✅ Token verified for user {user_id}")
+            logger.info("✅ Token verified for user %s", user_id)
             
-            return {
+            user_info = {
                 "uid": user_id,
                 "email": email,
                 "email_verified": decoded_token.get("email_verified", False),
                 "name": decoded_token.get("name", ""),
             }
+            
+            # TTLCache bounds the entry age; exp is re-checked on every hit
+            with _token_cache_lock:
+                _token_cache[cache_key] = (user_info, decoded_token.get("exp", 0))
+            
+            return user_info
         
         except firebase_admin.auth.InvalidIdTokenError:
             logger.warning("Invalid Firebase ID token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired Firebase token"
-            )
+            raise _unauthorized(_ERR_INVALID) from None
         except firebase_admin.auth.ExpiredIdTokenError:
             logger.warning("Expired Firebase ID token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Firebase token has expired"
-            )
+            raise _unauthorized(_ERR_EXPIRED) from None
         except Exception as e:
-            logger.error(f"Token verification failed: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication failed"
-            )
+            logger.error("Token verification failed: %s", e)
+            raise _unauthorized(_ERR_FAILED) from None
 
 
 # Global middleware instance
@@ -179,7 +432,14 @@ firebase_middleware: Optional[FirebaseAuthMiddleware] = None
 
 
 def initialize_auth_middleware(firebase_enabled: bool = True):
-    """Initialize auth middleware globally"""
+    """
+    Initialize auth middleware globally
+    
+    Firebase Admin is initialized here, once; verify_token assumes it is ready.
+    
+    Raises:
+        RuntimeError: If Firebase is enabled but could not be initialized
+    """
     global firebase_middleware
     firebase_middleware = FirebaseAuthMiddleware(firebase_enabled=firebase_enabled)
     logger.info(f"🔐 Auth middleware initialized (Firebase: {'enabled' if firebase_enabled else 'disabled'})")
@@ -187,10 +447,10 @@ def initialize_auth_middleware(firebase_enabled: bool = True):
     # Initialize Firebase immediately if enabled
     if firebase_enabled:
         logger.info("🔥 Attempting to initialize Firebase Admin SDK...")
-        if ensure_firebase_initialized():
-            logger.info("✅ Firebase Admin SDK ready")
-        else:
-            logger.warning("⚠️ Firebase Admin SDK initialization failed - auth will not work")
+        if not ensure_firebase_initialized():
+            logger.error("❌ Firebase Admin SDK initialization failed")
+            raise RuntimeError("Firebase auth is enabled but Firebase Admin SDK could not be initialized")
+        logger.info("✅ Firebase Admin SDK ready")
     
     return firebase_middleware
 
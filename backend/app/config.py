@@ -1,7 +1,12 @@
+import dataclasses
+import logging
+import os
 from pydantic_settings import BaseSettings
 from typing import Optional
 from functools import lru_cache
 
+logger = logging.getLogger(__name__)
+
 
 class Settings(BaseSettings):
     """Application configuration loaded from environment variables"""
@@ -36,6 +41,10 @@ class Settings(BaseSettings):
     firebase_credentials_json: Optional[str] = None  # JSON string for production deployment
     firebase_enabled: bool = False  # Enable Firebase auth
     firebase_project_id: Optional[str] = None  # Firebase project ID
+    token_cache_ttl: int = 30  # Seconds a verified ID token is reused without re-verification
+    token_cache_maxsize: int = 10000  # Max verified tokens kept in memory
+    jwks_cache_path: Optional[str] = None  # Signing-cert cache file shared by workers; must sit in an app-owned 0700 dir (None disables sharing)
+    probe_cache_dir: Optional[str] = None  # App-owned dir (created 0700) for /memory/debug probe embeddings (None keeps them in memory only)
     
     # Memory Settings
     chunk_size: int = 512
@@ -48,10 +57,55 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
-settings = Settings()
+# Immutable, slotted snapshot of Settings: validated once by Pydantic at import,
+# then read as plain attribute loads everywhere else
+FrozenSettings = dataclasses.make_dataclass(
+    "FrozenSettings",
+    [(name, field.annotation) for name, field in Settings.model_fields.items()],
+    frozen=True,
+    slots=True,
+)
+
+settings = FrozenSettings(**Settings().model_dump())
 
 
 @lru_cache()
-def get_settings() -> Settings:
+def get_settings() -> FrozenSettings:
     """Get application settings singleton (cached for performance)"""
     return settings
+
+
+@lru_cache()
+def load_firebase_credentials():
+    """
+    Load and parse the Firebase service account credentials once per process
+    
+    Tries FIREBASE_CREDENTIALS_JSON (production) first, then the
+    FIREBASE_CREDENTIALS_PATH file (local development).
+    
+    Returns:
+        firebase_admin Certificate credentials, or None if none are configured
+    """
+    import orjson
+    from firebase_admin import credentials
+    
+    firebase_json = settings.firebase_credentials_json or os.getenv('FIREBASE_CREDENTIALS_JSON')
+    if firebase_json:
+        try:
+            cred = credentials.Certificate(orjson.loads(firebase_json))
+            logger.info("🔍 Loaded Firebase credentials from FIREBASE_CREDENTIALS_JSON")
+            return cred
+        except Exception as e:
+            logger.error(f"❌ Failed to load FIREBASE_CREDENTIALS_JSON: {e}")
+    
+    firebase_path = settings.firebase_credentials_path or os.getenv('FIREBASE_CREDENTIALS_PATH')
+    if not firebase_path:
+        logger.warning("⚠️ FIREBASE_CREDENTIALS_PATH not set")
+        return None
+    if not os.path.exists(firebase_path):
+        logger.error(f"❌ Firebase credentials file NOT found at: {firebase_path}")
+        return None
+    
+    cred = credentials.Certificate(firebase_path)
+    logger.info(f"📁 Loaded Firebase credentials from file: {firebase_path}")
+    return cred
@@ -3,16 +3,16 @@ FastAPI dependencies for authentication
 """
 
 import logging
-from typing import Optional
+from typing import Mapping, Optional
 from fastapi import Depends, Header, HTTPException, status
-from app.auth_middleware import get_auth_middleware
+from app.auth_middleware import _DEFAULT_USER, get_auth_middleware
 
 logger = logging.getLogger(__name__)
 
 
 async def get_current_user(
     authorization: Optional[str] = Header(None)
-) -> dict:
+) -> Mapping:
     """
     Dependency to get current authenticated user
     
@@ -26,12 +26,16 @@ async def get_current_user(
         authorization: Authorization header from request
     
     Returns:
-        User info dictionary with uid, email, etc.
+        User info mapping with uid, email, etc. (read-only when auth is disabled)
     
     Raises:
         HTTPException: If not authenticated
     """
     middleware = get_auth_middleware()
+    if not middleware.firebase_enabled:
+        # Dev/demo mode: no header inspection, shared read-only default user
+        return _DEFAULT_USER
+    
     user_info = await middleware.verify_token(authorization)
     
     if not user_info.get("uid"):
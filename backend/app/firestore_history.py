@@ -3,10 +3,13 @@ Firestore integration for storing user search history
 Note: Firestore requires billing to be enabled. If billing is not enabled,
 history saving will be disabled but the app will continue to work.
 """
+import asyncio
 import firebase_admin
+from cachetools import LRUCache
 from firebase_admin import firestore
-from google.cloud.firestore_v1 import Client
-from datetime import datetime
+from google.cloud.firestore_v1 import AsyncClient
+from google.cloud.firestore_v1.async_collection import AsyncCollectionReference
+from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 import logging
 import os
@@ -19,10 +22,21 @@ FIRESTORE_DATABASE = "insightordb"
 # Flag to enable/disable Firestore history (set to false if billing is not enabled)
 FIRESTORE_ENABLED = os.getenv('FIRESTORE_ENABLED', 'false').lower() == 'true'
 
+# Firestore caps a single write batch at 500 operations
+FIRESTORE_BATCH_LIMIT = 500
+
+# Max per-user search_history collection refs kept for reuse
+HISTORY_REF_CACHE_SIZE = 10000
+
 class FirestoreHistoryManager:
     """Manages user search history in Firestore"""
     
+    __slots__ = ("db", "_user_hist_refs")
+    
     def __init__(self):
+        # users/{uid}/search_history refs, reused across calls for active users
+        self._user_hist_refs: LRUCache = LRUCache(maxsize=HISTORY_REF_CACHE_SIZE)
+        
         # If Firestore is disabled, skip initialization
         if not FIRESTORE_ENABLED:
             logger.info("ℹ️ Firestore history is disabled (FIRESTORE_ENABLED=false)")
@@ -34,59 +48,43 @@ class FirestoreHistoryManager:
             # Get the default app credentials
             app = firebase_admin.get_app()
             
-            # Create Firestore client with the named database
-            self.db = Client(
+            # Async client (grpc.aio) so history calls never block the event loop
+            self.db = AsyncClient(
                 project=app.project_id,
                 credentials=app.credential.get_credential(),
                 database=FIRESTORE_DATABASE
             )
             logger.info(f"✅ Firestore client initialized with database: {FIRESTORE_DATABASE}")
             
-            # Test connection and create database if needed
-            self._test_connection()
-            
         except Exception as e:
             logger.error(f"❌ Failed to initialize Firestore: {e}")
             logger.warning(f"⚠️  Firestore database '{FIRESTORE_DATABASE}' may not exist. Please verify in Firebase Console:")
             logger.warning("   https://console.firebase.google.com/project/research-agent-b7cb0/firestore")
             self.db = None
     
-    def _test_connection(self):
-        """Test Firestore connection and create initial structure if needed"""
-        try:
-            # Try to create a test collection to verify database exists
-            test_doc = self.db.collection('_test').document('connection')
-            test_doc.set({'created': datetime.now(), 'status': 'active'})
-            logger.info("✅ Firestore database connection verified")
-            
-            # Create initial collections structure
-            self._initialize_collections()
-            
-            # Clean up test document
-            test_doc.delete()
-            
-        except Exception as e:
-            # Silently disable Firestore if billing not enabled or database doesn't exist
-            logger.info("ℹ️ Firestore history disabled (billing may not be enabled)")
-            self.db = None
-    
-    def _initialize_collections(self):
-        """Initialize basic collection structure"""
+    async def check_connection(self, timeout: float = 1.0) -> bool:
+        """
+        Read-only Firestore health check (not run automatically)
+        
+        Args:
+            timeout: Seconds to wait for the collection listing
+        
+        Returns:
+            True if Firestore answered in time
+        """
+        if not self.db:
+            return False
+        
+        async def _first_collection():
+            async for _ in self.db.collections():
+                break
+        
         try:
-            # Create a sample user document to initialize the structure
-            sample_doc = self.db.collection('users').document('_sample').collection('search_history').document('_init')
-            sample_doc.set({
-                'query': 'Welcome to Insightor!',
-                'response': 'This is a sample search history entry.',
-                'sources': [],
-                'timestamp': datetime.utcnow(),
-                'created_at': firestore.SERVER_TIMESTAMP,
-                'is_sample': True
-            })
-            logger.info("✅ Initialized Firestore collections structure")
+            await asyncio.wait_for(_first_collection(), timeout=timeout)
+            return True
         except Exception as e:
-            logger.warning(f"⚠️  Could not initialize collections: {e}")
-            pass
+            logger.warning(f"⚠️  Firestore health check failed: {e}")
+            return False
     
     async def save_search_history(
         self, 
@@ -105,64 +103,149 @@ class FirestoreHistoryManager:
         users/{uid}/search_history/{entry_id}
         """
         if not self.db or not user_id:
-            logger.warning(f"⚠️ Cannot save history: db={bool(self.db)}, user_id={user_id}")
+            logger.warning("⚠️ Cannot save history: db=%s, user_id=%s", bool(self.db), user_id)
             return False
         
         try:
-            # Create history entry
-            history_entry = {
-                "query": query,
-                "response": response,
-                "sources": sources,
-                "search_results": search_results or [],
-                "insights": insights or [],
-                "memory_chunks": memory_chunks or [],
-                "timestamp": datetime.utcnow(),
-                "created_at": firestore.SERVER_TIMESTAMP
-            }
+            history_entry = self._build_history_entry(
+                query, response, sources, search_results, insights, memory_chunks
+            )
             
             # Save to Firestore
-            user_history_ref = self.db.collection("users").document(user_id).collection("search_history")
-            doc_ref = user_history_ref.add(history_entry)
+            user_history_ref = self._hist_ref(user_id)
+            await user_history_ref.add(history_entry)
             
-            logger.info(f"✅ Saved search history for user {user_id[:8]}")
+            logger.info("✅ Saved search history for user %.8s", user_id)
             return True
             
         except Exception as e:
             # Silent fail - don't log errors to avoid confusion when billing is not enabled
-            logger.debug(f"History save skipped: {e}")
+            logger.debug("History save skipped: %s", e)
             return False
     
+    def _hist_ref(self, user_id: str) -> AsyncCollectionReference:
+        """Get the (cached) search_history collection reference for a user"""
+        ref = self._user_hist_refs.get(user_id)
+        if ref is None:
+            ref = self.db.collection("users").document(user_id).collection("search_history")
+            self._user_hist_refs[user_id] = ref
+        return ref
+    
+    @staticmethod
+    def _build_history_entry(
+        query: str,
+        response: str,
+        sources: List[Dict[str, Any]],
+        search_results: Optional[List[Dict]] = None,
+        insights: Optional[List[str]] = None,
+        memory_chunks: Optional[List[Dict]] = None
+    ) -> Dict[str, Any]:
+        """Create a history entry document"""
+        return {
+            "query": query,
+            "response": response,
+            "sources": sources,
+            "search_results": search_results or [],
+            "insights": insights or [],
+            "memory_chunks": memory_chunks or [],
+            "timestamp": datetime.now(timezone.utc),
+            "created_at": firestore.SERVER_TIMESTAMP
+        }
+    
     async def get_search_history(
         self, 
         user_id: str, 
-        limit: int = 50
+        limit: int = 50,
+        start_after: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Get user's search history from Firestore
         
-        Returns entries in reverse chronological order
+        Returns entries in reverse chronological order. Pass the ``id`` of the
+        last entry of the previous page as ``start_after`` to fetch the next
+        page; Firestore resumes from that document instead of re-reading and
+        skipping the earlier ones.
         """
         if not self.db or not user_id:
-            logger.warning(f"⚠️ Cannot retrieve history: db={bool(self.db)}, user_id={user_id}")
+            logger.warning("⚠️ Cannot retrieve history: db=%s, user_id=%s", bool(self.db), user_id)
             return []
         
         try:
             # Query history collection, ordered by timestamp descending
-            user_history_ref = self.db.collection("users").document(user_id).collection("search_history")
-            docs = user_history_ref.order_by("created_at", direction=firestore.Query.DESCENDING).limit(limit).stream()
+            user_history_ref = self._hist_ref(user_id)
+            query = user_history_ref.order_by("created_at", direction=firestore.Query.DESCENDING)
+            
+            if start_after:
+                cursor_doc = await user_history_ref.document(start_after).get()
+                if cursor_doc.exists:
+                    query = query.start_after(cursor_doc)
+                else:
+                    logger.warning("⚠️ History cursor %s not found, returning first page", start_after)
             
             history = []
-            for doc in docs:
+            async for doc in query.limit(limit).stream():
                 entry = doc.to_dict()
                 entry["id"] = doc.id  # Include document ID
                 history.append(entry)
             
-            logger.info(f"✅ Retrieved {len(history)} history entries for user {user_id[:8]}")
+            logger.info("✅ Retrieved %d history entries for user %.8s", len(history), user_id)
+            return history
+            
+        except Exception as e:
+            logger.error("❌ Failed to retrieve search history: %s", e)
+            return []
+    
+    async def list_search_history(
+        self,
+        user_id: str,
+        limit: int = 50,
+        fields: Optional[List[str]] = None,
+        start_after: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List user's search history with only the requested fields
+        
+        Lightweight counterpart to get_search_history for list views: the
+        query is projected with select(), so large fields such as response,
+        search_results and memory_chunks are never read or sent.
+        
+        Args:
+            user_id: User ID
+            limit: Max entries per page
+            fields: Fields to return (defaults to query and timestamp)
+            start_after: created_at of the last entry of the previous page
+        
+        Returns:
+            Entries in reverse chronological order, each with "id" and "created_at"
+        """
+        if not self.db or not user_id:
+            logger.warning("⚠️ Cannot list history: db=%s, user_id=%s", bool(self.db), user_id)
+            return []
+        
+        # created_at is the sort key and the pagination cursor, so always project it
+        projection = list(dict.fromkeys([*(fields or ["query", "timestamp"]), "created_at"]))
+        
+        try:
+            user_history_ref = self._hist_ref(user_id)
+            query = user_history_ref.select(projection).order_by(
+                "created_at", direction=firestore.Query.DESCENDING
+            )
+            
+            # Cursor on the sort value: no extra document read, no O(offset) scan
+            if start_after is not None:
+                query = query.start_after({"created_at": start_after})
+            
+            history = []
+            async for doc in query.limit(limit).stream():
+                entry = doc.to_dict()
+                entry["id"] = doc.id
+                history.append(entry)
+            
+            logger.info("✅ Listed %d history entries for user %.8s", len(history), user_id)
             return history
             
         except Exception as e:
-            logger.error(f"❌ Failed to retrieve search history: {e}")
+            logger.error("❌ Failed to list search history: %s", e)
             return []
     
     async def delete_history_entry(
@@ -175,7 +258,7 @@ class FirestoreHistoryManager:
             return False
         
         try:
-            self.db.collection("users").document(user_id).collection("search_history").document(entry_id).delete()
+            await self._hist_ref(user_id).document(entry_id).delete()
             logger.info(f"✅ Deleted history entry {entry_id} for user {user_id[:8]}")
             return True
         except Exception as e:
@@ -188,13 +271,27 @@ class FirestoreHistoryManager:
             return False
         
         try:
-            user_history_ref = self.db.collection("users").document(user_id).collection("search_history")
-            docs = user_history_ref.stream()
+            user_history_ref = self._hist_ref(user_id)
+            # Only document references are needed, so skip the field payloads
+            docs = user_history_ref.select([]).stream()
             
-            for doc in docs:
-                doc.reference.delete()
+            # One commit per FIRESTORE_BATCH_LIMIT deletes instead of one RPC per doc
+            batch = self.db.batch()
+            count = 0
+            deleted = 0
+            async for doc in docs:
+                batch.delete(doc.reference)
+                count += 1
+                if count == FIRESTORE_BATCH_LIMIT:
+                    await batch.commit()
+                    deleted += count
+                    batch = self.db.batch()
+                    count = 0
+            if count:
+                await batch.commit()
+                deleted += count
             
-            logger.info(f"✅ Cleared all history for user {user_id[:8]}")
+            logger.info(f"✅ Cleared {deleted} history entries for user {user_id[:8]}")
             return True
         except Exception as e:
             logger.error(f"❌ Failed to clear history: {e}")
@@ -4,18 +4,24 @@ Exposes research endpoint and health checks
 Phase 3: Multi-user, RAG-powered research with Pinecone/Weaviate + Firebase
 """
 
+import asyncio
+import hashlib
 import logging
 import os
 from contextlib import asynccontextmanager
-from datetime import datetime
-from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
 import random
+import ssl
 import time
+from types import MappingProxyType
 
-from fastapi import FastAPI, HTTPException, status, Depends
+import orjson
+
+from fastapi import FastAPI, HTTPException, Request, status, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.security import HTTPBearer
+from pydantic import TypeAdapter
+from fastapi.responses import ORJSONResponse, RedirectResponse, Response
 
 # Configure logging early
 logging.basicConfig(
@@ -36,7 +42,8 @@ try:
     from app.models import (
         ResearchRequest, ResearchResponse, HealthResponse,
         ExtendedResearchResponse, UserInfo, ResearchHistoryResponse,
-        ResearchHistoryItem, TopicGraphResponse
+        ResearchHistoryItem, TopicGraphResponse, HistoryDeleteRequest,
+        SaveHistoryRequest
     )
     logger.info("✅ Models loaded")
 except Exception as e:
@@ -50,69 +57,44 @@ logger.info(f"📊 Vector DB Config: USE_PINECONE={USE_PINECONE}, USE_WEAVIATE={
 
 # ALL HEAVY IMPORTS ARE DEFERRED TO RUNTIME - Do NOT import at module level
 # This ensures the server binds to the port immediately
-AGENTS_AVAILABLE = False  # Will be set to True on first request
-ResearchOrchestrator = None
-EmbeddingGenerator = None
-FollowupAgent = None
-CitationExtractor = None
-TopicGraphAgent = None
-
-# Firebase imports - non-fatal if they fail (these are lightweight)
+# Agent classes are imported inside their get_* initializers on first use
+
+# Firebase imports - non-fatal if they fail. Skipped entirely when auth is
+# disabled so firebase_admin / google.* are never loaded in that case.
 FIREBASE_AVAILABLE = False
-try:
-    from app.auth import FirebaseAuth, initialize_firebase, get_firebase_auth
-    from app.auth_middleware import initialize_auth_middleware
-    from app.dependencies import get_current_user, get_user_id
-    FIREBASE_AVAILABLE = True
-    logger.info("✅ Firebase modules loaded")
-except Exception as e:
-    logger.warning(f"⚠️ Firebase modules not available: {e}")
-    # Create dummy functions
+if not settings.firebase_enabled:
+    logger.info("ℹ️  Firebase disabled - skipping auth module imports")
+    # Same read-only demo user app.dependencies returns when auth is off
+    _DEFAULT_USER = MappingProxyType({"uid": "default_user", "email": "demo@example.com"})
     def initialize_auth_middleware(**kwargs): pass
-    def get_current_user(): return None
-    def get_user_id(): return "anonymous"
+    async def get_current_user(): return _DEFAULT_USER
+    async def get_user_id(): return _DEFAULT_USER["uid"]
+else:
+    try:
+        from app.auth import FirebaseAuth, initialize_firebase, get_firebase_auth
+        from app.auth_middleware import initialize_auth_middleware
+        from app.dependencies import get_current_user, get_user_id
+        FIREBASE_AVAILABLE = True
+        logger.info("✅ Firebase modules loaded")
+    except Exception as e:
+        logger.warning(f"⚠️ Firebase modules not available: {e}")
+        # Create dummy functions
+        def initialize_auth_middleware(**kwargs): pass
+        def get_current_user(): return None
+        def get_user_id(): return "anonymous"
 
 # Use Pinecone for history (FREE - no billing required)
-from app.pinecone_history import get_pinecone_history_manager
-def get_history_manager():
-    return get_pinecone_history_manager()
-
-
-# Lazy loader for heavy modules
-def _load_agents():
-    """Load agent modules lazily on first use"""
-    global AGENTS_AVAILABLE, ResearchOrchestrator, EmbeddingGenerator
-    global FollowupAgent, CitationExtractor, TopicGraphAgent
-    
-    if not AGENTS_AVAILABLE:
-        logger.info("📦 Loading agent modules (lazy)...")
-        try:
-            from app.agents.orchestrator import ResearchOrchestrator as OC
-            from app.agents.embeddings import EmbeddingGenerator as EG
-            from app.agents.followup_agent import FollowupAgent as FA
-            from app.agents.citation_extractor import CitationExtractor as CE
-            from app.agents.topic_graph_agent import TopicGraphAgent as TG
-            
-            ResearchOrchestrator = OC
-            EmbeddingGenerator = EG
-            FollowupAgent = FA
-            CitationExtractor = CE
-            TopicGraphAgent = TG
-            AGENTS_AVAILABLE = True
-            logger.info("✅ Agent modules loaded successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to load agent modules: {e}")
-            raise
+from app.pinecone_history import PineconeHistoryManager, get_history_writer, get_pinecone_history_manager
+def get_history_manager(request: Request) -> PineconeHistoryManager:
+    """Dependency returning the history manager created once in lifespan"""
+    return request.app.state.history_manager
 
 
 # Lazy imports for vector memory - don't import at module level
 def get_vector_memory():
     if USE_PINECONE:
-        from app.agents.pinecone_memory import PineconeMemory
-        return PineconeMemory(
-            api_key=settings.pinecone_api_key,
-            environment=settings.pinecone_environment
-        )
+        from app.agents.pinecone_memory import get_pinecone_memory
+        return get_pinecone_memory()
     elif USE_WEAVIATE:
         from app.agents.weaviate_memory import get_weaviate_memory
         return get_weaviate_memory()
@@ -121,6 +103,164 @@ def get_vector_memory():
         return get_chroma_memory()
 
 
+_embedder = None
+_embedder_lock = None
+
+
+async def get_embedder():
+    """
+    Get the process-wide embedding generator with its model loaded
+    
+    The first call loads the SentenceTransformer in a worker thread under an
+    asyncio.Lock, so concurrent first requests share one load and the event
+    loop keeps serving meanwhile.
+    """
+    global _embedder, _embedder_lock
+    if _embedder is None:
+        if _embedder_lock is None:
+            _embedder_lock = asyncio.Lock()
+        async with _embedder_lock:
+            if _embedder is None:
+                from app.agents.embeddings import get_embedding_generator
+                embedder = get_embedding_generator()
+                await asyncio.to_thread(lambda: embedder.model)
+                _embedder = embedder
+    return _embedder
+
+
+# (whole second, ISO string) for the response timestamp helper below
+_iso_cache = (0, "")
+
+# Refreshes _iso_cache every second while the app runs (started in lifespan)
+_clock_task: Optional[asyncio.Task] = None
+
+# Background Weaviate import + connection (started in lifespan when enabled)
+_warmup_task: Optional[asyncio.Task] = None
+
+
+async def _warm_weaviate():
+    """Import Weaviate and open its connection without blocking the event loop"""
+    try:
+        # The import itself is heavy, so it runs in the worker thread too
+        memory = await asyncio.to_thread(get_vector_memory)
+        await memory.warmup()
+    except Exception as e:
+        logger.warning(f"⚠️  Weaviate warmup failed: {str(e)}")
+
+
+def _now_iso() -> str:
+    """Local time as an ISO-8601 string, rebuilt at most once per second"""
+    global _iso_cache
+    if _clock_task is not None:
+        # Kept current by _tick_clock: no clock read or formatting per call
+        return _iso_cache[1]
+    second = int(time.time())
+    if second != _iso_cache[0]:
+        _iso_cache = (second, datetime.fromtimestamp(second).isoformat())
+    return _iso_cache[1]
+
+
+async def _tick_clock():
+    """Rebuild the cached ISO timestamp at the start of every second"""
+    global _iso_cache
+    while True:
+        now = time.time()
+        second = int(now)
+        _iso_cache = (second, datetime.fromtimestamp(second).isoformat())
+        await asyncio.sleep(second + 1 - now)
+
+
+# /health body split around its timestamp (filled in by lifespan), plus the
+# (whole second, bytes) of the last assembled body
+_health_head = b""
+_health_tail = b""
+_health_cache = (0, b"")
+
+
+def _build_health_template():
+    """Serialize the static part of the /health response once"""
+    global _health_head, _health_tail
+    body = orjson.dumps(HealthResponse(
+        status="healthy",
+        timestamp="",
+        agents_ready={
+            "server": True,
+            "use_pinecone": USE_PINECONE,
+            "use_weaviate": USE_WEAVIATE,
+            "firebase_enabled": settings.firebase_enabled
+        }
+    ).model_dump())
+    _health_head, _health_tail = body.split(b'"timestamp":""')
+    _health_head += b'"timestamp":'
+
+
+# Constant /memory/debug probe queries; their embeddings are computed once
+PROBE_QUERIES = ("sample content", "sample topic", "test")
+_probe_vectors: Optional[Dict[str, list]] = None
+
+
+async def get_probe_vectors(embedder) -> Dict[str, list]:
+    """
+    Get the embeddings of PROBE_QUERIES, encoding them at most once per model
+    
+    When settings.probe_cache_dir is set, vectors are also persisted there as a
+    per-model .npy file so restarts load them instead of re-running the encoder.
+    The directory is created 0700 and only used if this uid owns it and no one
+    else can write to it; loaded files must match the expected shape and dtype.
+    
+    Args:
+        embedder: Embedding generator (model_name, embedding_dim, encode)
+    
+    Returns:
+        Mapping of probe query to embedding list
+    """
+    global _probe_vectors
+    if _probe_vectors is None:
+        import stat
+        import numpy as np
+        
+        expected_shape = (len(PROBE_QUERIES), embedder.embedding_dim)
+        cache_path = None
+        if settings.probe_cache_dir:
+            safe_model = embedder.model_name.replace("/", "_")
+            cache_path = os.path.join(settings.probe_cache_dir, f"probe_vectors_{safe_model}.npy")
+        
+        def _trusted_cache_dir() -> bool:
+            try:
+                os.makedirs(settings.probe_cache_dir, mode=0o700, exist_ok=True)
+                st = os.stat(settings.probe_cache_dir)
+            except OSError as e:
+                logger.warning(f"⚠️  Probe cache dir unavailable: {e}")
+                return False
+            if st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+                logger.warning(f"⚠️  Ignoring probe cache dir not owned by us or writable by others: {settings.probe_cache_dir}")
+                return False
+            return True
+        
+        def _load_or_encode():
+            trusted = cache_path is not None and _trusted_cache_dir()
+            if trusted:
+                try:
+                    vectors = np.load(cache_path, allow_pickle=False)
+                    if (vectors.shape == expected_shape and vectors.dtype == np.float32
+                            and np.isfinite(vectors).all()):
+                        return vectors
+                    logger.warning("⚠️  Discarding probe embeddings with unexpected shape or dtype")
+                except (OSError, ValueError):
+                    pass
+            vectors = np.asarray(embedder.encode(list(PROBE_QUERIES)), dtype=np.float32)
+            if trusted:
+                try:
+                    np.save(cache_path, vectors)
+                except OSError as e:
+                    logger.warning(f"⚠️  Could not persist probe embeddings: {e}")
+            return vectors
+        
+        vectors = await asyncio.to_thread(_load_or_encode)
+        _probe_vectors = {query: vector.tolist() for query, vector in zip(PROBE_QUERIES, vectors)}
+    return _probe_vectors
+
+
 # Global instances
 orchestrator = None
 followup_agent = None
@@ -128,6 +268,23 @@ citation_extractor = None
 topic_graph_agent = None
 firebase_auth = None
 
+# /system/status component flags; rebuilt only after a lazy getter fills a global
+_component_status: Optional[Dict[str, bool]] = None
+
+
+def _get_component_status() -> Dict[str, bool]:
+    """Get the cached component-initialized flags, rebuilding them if stale"""
+    global _component_status
+    if _component_status is None:
+        _component_status = {
+            "orchestrator": orchestrator is not None,
+            "followup_agent": followup_agent is not None,
+            "citation_extractor": citation_extractor is not None,
+            "topic_graph_agent": topic_graph_agent is not None,
+            "firebase_auth": firebase_auth is not None and settings.firebase_enabled
+        }
+    return _component_status
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -137,10 +294,12 @@ async def lifespan(app: FastAPI):
     Uses lazy initialization to ensure port binds quickly
     """
     # Startup - Keep minimal to ensure port binds quickly
-    global orchestrator, followup_agent, citation_extractor, topic_graph_agent, firebase_auth
+    global orchestrator, followup_agent, citation_extractor, topic_graph_agent, firebase_auth, _clock_task, _warmup_task
     
     logger.info("🚀 Starting Insightor Backend...")
     logger.info(f"📊 Config: USE_PINECONE={USE_PINECONE}, USE_WEAVIATE={USE_WEAVIATE}")
+    # Token cache keys and TLS both hash through this build; log it for perf triage
+    logger.info(f"🔒 Crypto backend: {ssl.OPENSSL_VERSION}")
     
     # Initialize Auth Middleware (lightweight) - wrapped in try/except
     if FIREBASE_AVAILABLE:
@@ -148,10 +307,30 @@ async def lifespan(app: FastAPI):
             initialize_auth_middleware(firebase_enabled=settings.firebase_enabled)
             logger.info("✅ Auth middleware initialized")
         except Exception as e:
+            if settings.firebase_enabled:
+                # verify_token no longer re-checks init per request, so don't serve without it
+                logger.error(f"❌ Auth middleware failed: {str(e)} - aborting startup")
+                raise
             logger.warning(f"⚠️  Auth middleware failed: {str(e)} - continuing without auth")
     else:
         logger.warning("⚠️  Firebase not available - auth disabled")
     
+    # Open the Weaviate connection in the background so it overlaps startup
+    if USE_WEAVIATE:
+        _warmup_task = asyncio.create_task(_warm_weaviate())
+    
+    # /health then only splices a timestamp into pre-serialized bytes
+    _build_health_template()
+    
+    # Timestamps in responses come from a once-a-second background tick
+    _clock_task = asyncio.create_task(_tick_clock())
+    
+    # One history manager (and Pinecone client/connection pool) for every request
+    app.state.history_manager = await asyncio.to_thread(get_pinecone_history_manager)
+    
+    # Coalesces /research history saves into batched upserts
+    get_history_writer().start()
+    
     # Yield immediately to allow port binding - components will be initialized lazily
     logger.info("✅ Server starting - components will initialize on first request...")
     
@@ -159,34 +338,38 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🛑 Shutting down application...")
+    await get_history_writer().stop()
+    _clock_task.cancel()
+    _clock_task = None
+    if _warmup_task is not None:
+        _warmup_task.cancel()
+        _warmup_task = None
+    app.state.history_manager.shutdown()
 
 
 def get_orchestrator():
     """Lazy initialization of orchestrator"""
-    global orchestrator, ResearchOrchestrator
+    global orchestrator, _component_status
     if orchestrator is None:
         logger.info("📡 Initializing Research Orchestrator (lazy)...")
-        # Import if not already imported
-        if ResearchOrchestrator is None:
-            from app.agents.orchestrator import ResearchOrchestrator as OrchestratorClass
-            ResearchOrchestrator = OrchestratorClass
+        from app.agents.orchestrator import ResearchOrchestrator
         orchestrator = ResearchOrchestrator(
             tavily_key=settings.tavily_api_key,
             gemini_key=settings.google_api_key
         )
+        _component_status = None
         logger.info("✅ Orchestrator initialized")
     return orchestrator
 
 
 def get_followup_agent():
     """Lazy initialization of followup agent"""
-    global followup_agent, FollowupAgent
+    global followup_agent, _component_status
     if followup_agent is None:
         try:
-            if FollowupAgent is None:
-                from app.agents.followup_agent import FollowupAgent as FAClass
-                FollowupAgent = FAClass
+            from app.agents.followup_agent import FollowupAgent
             followup_agent = FollowupAgent(gemini_api_key=settings.google_api_key)
+            _component_status = None
             logger.info("✅ FollowupAgent initialized")
         except Exception as e:
             logger.warning(f"⚠️  FollowupAgent failed: {str(e)}")
@@ -195,13 +378,12 @@ def get_followup_agent():
 
 def get_citation_extractor():
     """Lazy initialization of citation extractor"""
-    global citation_extractor, CitationExtractor
+    global citation_extractor, _component_status
     if citation_extractor is None:
         try:
-            if CitationExtractor is None:
-                from app.agents.citation_extractor import CitationExtractor as CEClass
-                CitationExtractor = CEClass
+            from app.agents.citation_extractor import CitationExtractor
             citation_extractor = CitationExtractor()
+            _component_status = None
             logger.info("✅ CitationExtractor initialized")
         except Exception as e:
             logger.warning(f"⚠️  CitationExtractor failed: {str(e)}")
@@ -210,13 +392,14 @@ def get_citation_extractor():
 
 def init_firebase_lazy():
     """Lazy initialization of Firebase"""
-    global firebase_auth
+    global firebase_auth, _component_status
     if firebase_auth is None and settings.firebase_enabled:
         try:
             firebase_auth = initialize_firebase(
                 credentials_path=settings.firebase_credentials_path,
                 credentials_json=settings.firebase_credentials_json
             )
+            _component_status = None
             logger.info("✅ Firebase initialized (lazy)")
         except Exception as e:
             logger.warning(f"⚠️  Firebase initialization failed: {str(e)}")
@@ -227,32 +410,75 @@ app = FastAPI(
     title="Insightor - AI Research Assistant",
     description="Phase-1: Search Agent → Reader Agent → Gemini LLM Pipeline",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Define allowed origins for CORS
 ALLOWED_ORIGINS = [
     settings.frontend_url,
-    "http://localhost:3000",
-    "http://localhost:5173",
     "https://insightor-research-assistant.vercel.app",
     "https://insightor-omega.vercel.app",
     "https://insightor.vercel.app",
-    # Allow all Vercel preview deployments
-    "https://*.vercel.app",
 ]
 
-# Filter out None values and wildcards for initial list
-filtered_origins = [origin for origin in ALLOWED_ORIGINS if origin and not origin.startswith("https://*")]
+# Local dev servers on any port, plus all Vercel preview deployments
+ALLOWED_ORIGIN_REGEX = r"https?://localhost(:\d+)?|https://[a-z0-9-]+\.vercel\.app"
+
+# Largest /history/save body accepted; anything bigger is refused before it is read
+HISTORY_MAX_BODY_BYTES = 1024 * 1024
 
-# Add CORS middleware with flexible origin handling
+
+class BodyLimitMiddleware:
+    """
+    Refuse oversized request bodies on one route before any byte is read
+    
+    A Content-Length is required (411 otherwise, which rules out unbounded
+    chunked uploads); the server then reads exactly that many bytes, so
+    checking the header bounds what is actually received.
+    """
+    
+    def __init__(self, app, path: str, max_bytes: int):
+        """
+        Args:
+            app: Wrapped ASGI app
+            path: Exact request path to guard (POST only)
+            max_bytes: Largest accepted body
+        """
+        self.app = app
+        self.path = path
+        self.max_bytes = max_bytes
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] == self.path:
+            content_length = next((value for name, value in scope["headers"] if name == b"content-length"), None)
+            if content_length is None or not content_length.isdigit():
+                response = ORJSONResponse(
+                    status_code=status.HTTP_411_LENGTH_REQUIRED,
+                    content={"detail": "Content-Length required"}
+                )
+                return await response(scope, receive, send)
+            if int(content_length) > self.max_bytes:
+                response = ORJSONResponse(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    content={"detail": f"Payload exceeds {self.max_bytes} bytes"}
+                )
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+
+# Added before CORS so its 411/413 responses still carry CORS headers
+app.add_middleware(BodyLimitMiddleware, path="/history/save", max_bytes=HISTORY_MAX_BODY_BYTES)
+
+# Add CORS middleware: one compiled-regex fullmatch, then an O(1) set lookup
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=filtered_origins,
-    allow_origin_regex=r"https://.*\.vercel\.app",  # Allow all Vercel subdomains
+    allow_origins=frozenset(origin for origin in ALLOWED_ORIGINS if origin),
+    allow_origin_regex=ALLOWED_ORIGIN_REGEX,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Explicit lists: preflights become set lookups instead of echoing wildcards
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
 
@@ -288,7 +514,7 @@ async def verify_token(user: dict = Depends(get_current_user)):
         "email": user.get("email"),
         "name": user.get("name"),
         "email_verified": user.get("email_verified"),
-        "timestamp": datetime.now().isoformat()
+        "timestamp": _now_iso()
     }
 
 
@@ -303,7 +529,7 @@ async def logout(user: dict = Depends(get_current_user)):
     Returns:
         Logout confirmation
     """
-    logger.info(f"👋 User {user.get('uid')} logged out")
+    logger.info("👋 User %s logged out", user.get('uid'))
     return {
         "status": "logged_out",
         "message": "Please clear the authentication token from your client"
@@ -316,20 +542,19 @@ async def health_check():
     Health check endpoint
     Returns healthy status immediately - components initialize lazily
     """
+    global _health_cache
     try:
-        # Simple health check that doesn't require full initialization
-        return HealthResponse(
-            status="healthy",
-            timestamp=datetime.now().isoformat(),
-            agents_ready={
-                "server": True,
-                "use_pinecone": USE_PINECONE,
-                "use_weaviate": USE_WEAVIATE,
-                "firebase_enabled": settings.firebase_enabled
-            }
-        )
+        # Simple health check that doesn't require full initialization;
+        # the body is rebuilt at most once per second, never re-validated
+        timestamp = _now_iso()
+        second = _iso_cache[0]
+        if second != _health_cache[0]:
+            if not _health_head:
+                _build_health_template()
+            _health_cache = (second, _health_head + orjson.dumps(timestamp) + _health_tail)
+        return Response(content=_health_cache[1], media_type="application/json")
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+        logger.error("Health check failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Service not available"
@@ -361,7 +586,7 @@ async def research(
     """
     user_id = user.get("uid")
     user_email = user.get("email")
-    logger.info(f"📥 Research request from {user_email} ({user_id[:8]}...): {request.query}")
+    logger.info("📥 Research request from %s (%.8s...): %s", user_email, user_id, request.query)
     try:
         if not request.query or len(request.query.strip()) == 0:
             raise HTTPException(
@@ -369,7 +594,7 @@ async def research(
                 detail="Query cannot be empty"
             )
         
-        logger.info(f"📥 Received research request: {request.query}")
+        logger.info("📥 Received research request: %s", request.query)
         
         # Get orchestrator (lazy initialization)
         orch = get_orchestrator()
@@ -378,38 +603,30 @@ async def research(
         result = await orch.execute_research(request.query)
         
         if result.get("status") == "error":
-            logger.error(f"Research failed: {result.get('error')}")
+            logger.error("Research failed: %s", result.get('error'))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=result.get("error", "Research failed")
             )
         
-        logger.info(f"✅ Research completed successfully")
+        logger.info("✅ Research completed successfully")
         
-        # Auto-save to history (fire and forget)
+        # Auto-save to history (queued for the batched background writer)
         try:
-            history_manager = get_history_manager()
-            if history_manager:
-                # Extract relevant data from result
-                search_results = result.get("search_results", [])
-                response_text = result.get("final_summary", "")
-                insights = result.get("top_insights", [])
-                memory_chunks = result.get("relevant_memory_chunks", [])
-                
-                # Save asynchronously in background
-                import asyncio
-                asyncio.create_task(history_manager.save_search_history(
-                    user_id=user_id,
-                    query=request.query,
-                    response=response_text,
-                    sources=search_results,  # Use search_results as sources
-                    search_results=search_results,
-                    insights=insights,
-                    memory_chunks=memory_chunks
-                ))
-                logger.info(f"💾 Queued history save for user {user_id[:8]}")
+            # Extract relevant data from result
+            search_results = result.get("search_results", [])
+            
+            await get_history_writer().put({
+                "user_id": user_id,
+                "query": request.query,
+                "response": result.get("final_summary", ""),
+                "search_results": search_results,  # also stored as sources
+                "insights": result.get("top_insights", []),
+                "memory_chunks": result.get("relevant_memory_chunks", [])
+            })
+            logger.info("💾 Queued history save for user %.8s", user_id)
         except Exception as e:
-            logger.warning(f"⚠️  Failed to queue history save: {str(e)}")
+            logger.warning("⚠️  Failed to queue history save: %s", e)
             # Don't fail the request if history save fails
         
         return result
@@ -417,7 +634,7 @@ async def research(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Unexpected error in research endpoint: {str(e)}", exc_info=True)
+        logger.error("❌ Unexpected error in research endpoint: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Research failed: {str(e)}"
@@ -433,7 +650,7 @@ async def get_status():
         "application": "Insightor AI Research Assistant",
         "phase": "Phase-1: Search → Reader → Gemini",
         "status": "running",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _now_iso(),
         "api_version": "v1",
         "endpoints": {
             "research": "POST /research",
@@ -444,7 +661,7 @@ async def get_status():
     }
 
 
-@app.get("/memory/debug", tags=["Debug"])
+@app.get("/memory/debug", response_class=ORJSONResponse, tags=["Debug"])
 async def memory_debug():
     """
     Memory Debug Mode endpoint
@@ -461,16 +678,19 @@ async def memory_debug():
         logger.info("🔍 Memory Debug endpoint called")
         
         # Get embedder and memory instances
-        embedder = EmbeddingGenerator()
+        embedder = await get_embedder()
         vector_memory = get_vector_memory()
-        
-        # === 1. VECTOR MEMORY STATS ===
-        stats = vector_memory.get_collection_stats()
+        probe_vectors = await get_probe_vectors(embedder)
         
         backend = "Pinecone" if USE_PINECONE else ("Weaviate" if USE_WEAVIATE else "ChromaDB")
         
-        debug_response = {
-            "stats": {
+        # The four probes are independent vector-store round trips; each runs
+        # in its own worker thread so the endpoint costs max(RTT), not sum(RTT)
+        
+        # === 1. VECTOR MEMORY STATS ===
+        def _probe_stats():
+            stats = vector_memory.get_collection_stats()
+            return {
                 "backend": backend,
                 "research_chunks_count": stats.get("research_chunks", 0),
                 "topic_memory_count": stats.get("topic_memory", 0),
@@ -478,27 +698,22 @@ async def memory_debug():
                 "embedding_dimension": embedder.embedding_dim,
                 "embedding_model": embedder.model_name,
                 "unlimited_storage": stats.get("unlimited_storage", backend in ["Pinecone", "Weaviate"]),
-            },
-            "sample_research_chunk": None,
-            "sample_topic_memory": None,
-            "retrieval_test": None,
-            "timestamp": datetime.now().isoformat()
-        }
+            }
         
         # === 2. SAMPLE RESEARCH CHUNK (backend agnostic) ===
-        try:
+        def _probe_research_sample():
             # For Pinecone/Weaviate, we retrieve via vector search
             # For ChromaDB, we access collection directly
             if USE_PINECONE or USE_WEAVIATE:
                 # Use retrieval to get sample
-                test_embedding = embedder.encode("sample content")
+                test_embedding = probe_vectors["sample content"]
                 sample_results = vector_memory.retrieve_similar_chunks(
                     query_embedding=test_embedding,
                     n_results=1
                 )
                 if sample_results.get("chunks"):
                     chunk_info = sample_results["chunks"][0]
-                    debug_response["sample_research_chunk"] = {
+                    return {
                         "text_preview": chunk_info.get("content", "")[:500],
                         "full_length": len(chunk_info.get("content", "")),
                         "metadata": chunk_info.get("metadata", {})
@@ -506,34 +721,33 @@ async def memory_debug():
             else:
                 chunk_count = vector_memory.research_chunks.count()
                 if chunk_count > 0:
-                    all_chunks = vector_memory.research_chunks.get()
-                    if all_chunks.get("ids") and len(all_chunks["ids"]) > 0:
-                        idx = random.randint(0, len(all_chunks["ids"]) - 1)
-                        chunk_id = all_chunks["ids"][idx]
-                        chunk_text = all_chunks["documents"][idx]
-                        chunk_metadata = all_chunks["metadatas"][idx] if all_chunks.get("metadatas") else {}
-                        debug_response["sample_research_chunk"] = {
-                            "id": chunk_id,
+                    # Fetch just one document at a random offset, not the whole collection
+                    sample = vector_memory.research_chunks.get(
+                        limit=1,
+                        offset=random.randint(0, chunk_count - 1),
+                        include=["documents", "metadatas"]
+                    )
+                    if sample.get("ids"):
+                        chunk_text = sample["documents"][0]
+                        return {
+                            "id": sample["ids"][0],
                             "text_preview": chunk_text[:500] if chunk_text else "",
                             "full_length": len(chunk_text) if chunk_text else 0,
-                            "metadata": chunk_metadata
+                            "metadata": sample["metadatas"][0] if sample.get("metadatas") else {}
                         }
-            logger.info("✅ Sample research chunk retrieved")
-        except Exception as e:
-            logger.warning(f"⚠️  Could not retrieve sample research chunk: {str(e)}")
-            debug_response["sample_research_chunk"] = {"error": str(e)}
+            return None
         
         # === 3. SAMPLE TOPIC MEMORY (backend agnostic) ===
-        try:
+        def _probe_topic_sample():
             if USE_PINECONE or USE_WEAVIATE:
-                test_embedding = embedder.encode("sample topic")
+                test_embedding = probe_vectors["sample topic"]
                 sample_results = vector_memory.retrieve_topic_memory(
                     query_embedding=test_embedding,
                     n_results=1
                 )
                 if sample_results.get("memories"):
                     memory_info = sample_results["memories"][0]
-                    debug_response["sample_topic_memory"] = {
+                    return {
                         "text_preview": memory_info.get("summary", "")[:500],
                         "full_length": len(memory_info.get("summary", "")),
                         "metadata": memory_info.get("metadata", {})
@@ -541,31 +755,28 @@ async def memory_debug():
             else:
                 memory_count = vector_memory.topic_memory.count()
                 if memory_count > 0:
-                    all_memory = vector_memory.topic_memory.get()
-                    if all_memory.get("ids") and len(all_memory["ids"]) > 0:
-                        idx = random.randint(0, len(all_memory["ids"]) - 1)
-                        memory_id = all_memory["ids"][idx]
-                        memory_text = all_memory["documents"][idx]
-                        memory_metadata = all_memory["metadatas"][idx] if all_memory.get("metadatas") else {}
-                        debug_response["sample_topic_memory"] = {
-                            "id": memory_id,
+                    # Fetch just one document at a random offset, not the whole collection
+                    sample = vector_memory.topic_memory.get(
+                        limit=1,
+                        offset=random.randint(0, memory_count - 1),
+                        include=["documents", "metadatas"]
+                    )
+                    if sample.get("ids"):
+                        memory_text = sample["documents"][0]
+                        return {
+                            "id": sample["ids"][0],
                             "text_preview": memory_text[:500] if memory_text else "",
                             "full_length": len(memory_text) if memory_text else 0,
-                            "metadata": memory_metadata
+                            "metadata": sample["metadatas"][0] if sample.get("metadatas") else {}
                         }
-            logger.info("✅ Sample topic memory retrieved")
-        except Exception as e:
-            logger.warning(f"⚠️  Could not retrieve sample topic memory: {str(e)}")
-            debug_response["sample_topic_memory"] = {"error": str(e)}
+            return None
         
         # === 4. RETRIEVAL DIAGNOSTICS ===
-        try:
+        def _probe_retrieval():
             test_query = "test"
-            logger.info(f"🔎 Running retrieval diagnostics with test query: '{test_query}'")
             
-            # Embed the test query
-            test_embedding = embedder.encode(test_query)
-            logger.info(f"✅ Test query embedded (dim={len(test_embedding)})")
+            # Precomputed embedding of the test query
+            test_embedding = probe_vectors[test_query]
             
             # Retrieve top-3 from research_chunks
             retrieval_results = vector_memory.retrieve_similar_chunks(
@@ -576,43 +787,71 @@ async def memory_debug():
             
             # Format retrieval results
             formatted_chunks = []
-            if retrieval_results.get("chunks"):
-                for chunk_info in retrieval_results["chunks"]:
-                    formatted_chunks.append({
-                        "id": chunk_info.get("metadata", {}).get("id", "N/A"),
-                        "text_preview": chunk_info.get("content", "")[:300],  # 300 char preview
-                        "full_length": len(chunk_info.get("content", "")),
-                        "similarity_score": round(chunk_info.get("similarity", 0), 4),
-                        "metadata": chunk_info.get("metadata", {})
-                    })
+            for chunk_info in retrieval_results.get("chunks") or []:
+                formatted_chunks.append({
+                    "id": chunk_info.get("metadata", {}).get("id", "N/A"),
+                    "text_preview": chunk_info.get("content", "")[:300],  # 300 char preview
+                    "full_length": len(chunk_info.get("content", "")),
+                    "similarity_score": round(chunk_info.get("similarity", 0), 4),
+                    "metadata": chunk_info.get("metadata", {})
+                })
             
-            debug_response["retrieval_test"] = {
+            return {
                 "query": test_query,
                 "test_embedding_dim": len(test_embedding),
                 "results_count": len(formatted_chunks),
                 "top_results": formatted_chunks
             }
-            
-            logger.info(f"✅ Retrieval diagnostics complete ({len(formatted_chunks)} results)")
-            
-        except Exception as e:
-            logger.error(f"❌ Retrieval diagnostics failed: {str(e)}")
-            debug_response["retrieval_test"] = {"error": str(e)}
+        
+        stats_r, research_r, topic_r, retrieval_r = await asyncio.gather(
+            asyncio.to_thread(_probe_stats),
+            asyncio.to_thread(_probe_research_sample),
+            asyncio.to_thread(_probe_topic_sample),
+            asyncio.to_thread(_probe_retrieval),
+            return_exceptions=True
+        )
+        
+        # Stats are required; the samples and diagnostics degrade to an error entry
+        if isinstance(stats_r, BaseException):
+            raise stats_r
+        
+        if isinstance(research_r, BaseException):
+            logger.warning("⚠️  Could not retrieve sample research chunk: %s", research_r)
+            research_r = {"error": str(research_r)}
+        if isinstance(topic_r, BaseException):
+            logger.warning("⚠️  Could not retrieve sample topic memory: %s", topic_r)
+            topic_r = {"error": str(topic_r)}
+        if isinstance(retrieval_r, BaseException):
+            logger.error("❌ Retrieval diagnostics failed: %s", retrieval_r)
+            retrieval_r = {"error": str(retrieval_r)}
+        
+        debug_response = {
+            "stats": stats_r,
+            "sample_research_chunk": research_r,
+            "sample_topic_memory": topic_r,
+            "retrieval_test": retrieval_r,
+            "timestamp": _now_iso()
+        }
         
         logger.info("✅ Memory debug endpoint completed successfully")
-        return debug_response
+        # Already plain JSON types: hand straight to orjson, skipping jsonable_encoder
+        return ORJSONResponse(debug_response)
         
     except Exception as e:
-        logger.error(f"❌ Memory debug endpoint failed: {str(e)}", exc_info=True)
+        logger.error("❌ Memory debug endpoint failed: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Memory debug failed: {str(e)}"
         )
 
 
-@app.get("/research/history", tags=["Research"])
+# Built once: validates a list of history items in a single batched pass
+_HISTORY_ITEMS_ADAPTER = TypeAdapter(List[ResearchHistoryItem])
+
+
+@app.get("/research/history", response_class=ORJSONResponse, tags=["Research"])
 async def research_history(
-    user_id: str = Depends(lambda creds: creds if settings.firebase_enabled else "default_user") if settings.firebase_enabled else "default_user",
+    user_id: str = Depends(get_user_id),
     limit: int = 20,
     offset: int = 0
 ):
@@ -634,20 +873,21 @@ async def research_history(
                 detail="Qdrant memory not initialized"
             )
         
-        logger.info(f"📜 Fetching research history for user {user_id[:8]}...")
+        logger.info("📜 Fetching research history for user %.8s...", user_id)
         history_data = await qdrant_memory.retrieve_history(user_id, limit, offset)
         
-        history_items = [
-            ResearchHistoryItem(
-                id=item.get("id"),
-                query=item.get("query"),
-                timestamp=item.get("timestamp"),
-                summary_preview=item.get("text_preview"),
-                insights_count=item.get("insights_count", 0),
-                sources_count=item.get("sources_count", 0)
-            )
+        # Validate the whole page in one pydantic-core call
+        history_items = _HISTORY_ITEMS_ADAPTER.validate_python([
+            {
+                "id": item.get("id"),
+                "query": item.get("query"),
+                "timestamp": item.get("timestamp"),
+                "summary_preview": item.get("text_preview"),
+                "insights_count": item.get("insights_count", 0),
+                "sources_count": item.get("sources_count", 0)
+            }
             for item in history_data.get("history", [])
-        ]
+        ])
         
         return ResearchHistoryResponse(
             history=history_items,
@@ -657,7 +897,7 @@ async def research_history(
         )
     
     except Exception as e:
-        logger.error(f"❌ Failed to fetch history: {str(e)}")
+        logger.error("❌ Failed to fetch history: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch history: {str(e)}"
@@ -667,7 +907,7 @@ async def research_history(
 @app.delete("/research/{summary_id}", tags=["Research"])
 async def delete_research(
     summary_id: str,
-    user_id: str = Depends(lambda creds: creds if settings.firebase_enabled else "default_user") if settings.firebase_enabled else "default_user"
+    user_id: str = Depends(get_user_id)
 ):
     """
     Delete a specific research summary
@@ -686,7 +926,7 @@ async def delete_research(
                 detail="Qdrant memory not initialized"
             )
         
-        logger.info(f"🗑️  Deleting summary {summary_id[:8]}... for user {user_id[:8]}...")
+        logger.info("🗑️  Deleting summary %.8s... for user %.8s...", summary_id, user_id)
         success = await qdrant_memory.delete_summary(user_id, summary_id)
         
         if not success:
@@ -700,7 +940,7 @@ async def delete_research(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Failed to delete summary: {str(e)}")
+        logger.error("❌ Failed to delete summary: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete summary: {str(e)}"
@@ -709,7 +949,7 @@ async def delete_research(
 
 @app.delete("/research/all", tags=["Research"])
 async def delete_all_research(
-    user_id: str = Depends(lambda creds: creds if settings.firebase_enabled else "default_user") if settings.firebase_enabled else "default_user"
+    user_id: str = Depends(get_user_id)
 ):
     """
     Delete ALL research data for user
@@ -727,7 +967,7 @@ async def delete_all_research(
                 detail="Qdrant memory not initialized"
             )
         
-        logger.info(f"⚠️  DELETING ALL DATA for user {user_id[:8]}...")
+        logger.info("⚠️  DELETING ALL DATA for user %.8s...", user_id)
         success = await qdrant_memory.delete_user_data(user_id)
         
         if not success:
@@ -741,16 +981,16 @@ async def delete_all_research(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Failed to delete all research: {str(e)}")
+        logger.error("❌ Failed to delete all research: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete data: {str(e)}"
         )
 
 
-@app.get("/topics/graph", tags=["Topics"])
+@app.get("/topics/graph", response_class=ORJSONResponse, tags=["Topics"])
 async def get_topic_graph(
-    user_id: str = Depends(lambda creds: creds if settings.firebase_enabled else "default_user") if settings.firebase_enabled else "default_user",
+    user_id: str = Depends(get_user_id),
     limit: int = 50
 ):
     """
@@ -770,7 +1010,7 @@ async def get_topic_graph(
                 detail="Topic graph not initialized"
             )
         
-        logger.info(f"📊 Fetching topic graph for user {user_id[:8]}...")
+        logger.info("📊 Fetching topic graph for user %.8s...", user_id)
         graph_data = await topic_graph_agent.get_topic_graph(user_id, limit)
         
         return TopicGraphResponse(
@@ -781,7 +1021,7 @@ async def get_topic_graph(
         )
     
     except Exception as e:
-        logger.error(f"❌ Failed to fetch topic graph: {str(e)}")
+        logger.error("❌ Failed to fetch topic graph: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch topic graph: {str(e)}"
@@ -794,34 +1034,25 @@ async def get_topic_graph(
 
 @app.post("/history/save", tags=["History"])
 async def save_search_history(
-    query: str,
-    response: str,
-    sources: list = None,
-    search_results: list = None,
-    insights: list = None,
-    memory_chunks: list = None,
-    user: dict = Depends(get_current_user)
+    payload: SaveHistoryRequest,
+    user: dict = Depends(get_current_user),
+    history_manager: PineconeHistoryManager = Depends(get_history_manager)
 ):
     """
     Save a search query and response to user's history
     
     Args:
-        query: The search query
-        response: The research response/summary
-        sources: List of source documents used
-        search_results: Search results from Tavily
-        insights: Extracted insights
-        memory_chunks: Related memory chunks
+        payload: Query, response, sources, search results, insights and memory chunks
         user: Authenticated user
+        history_manager: Shared history manager
         
     Returns:
         Status confirmation
     """
     user_id = user.get("uid")
-    logger.info(f"💾 Saving search history for user {user_id[:8]}: {query[:50]}...")
+    logger.info("💾 Saving search history for user %.8s: %.50s...", user_id, payload.query)
     
     try:
-        history_manager = get_history_manager()
         if not history_manager:
             logger.warning("⚠️  History manager not available")
             return {
@@ -830,25 +1061,22 @@ async def save_search_history(
                 "saved": False
             }
         
-        success = await history_manager.save_search_history(
-            user_id=user_id,
-            query=query,
-            response=response,
-            sources=sources or [],
-            search_results=search_results,
-            insights=insights,
-            memory_chunks=memory_chunks
-        )
+        # Coalesced with concurrent saves into one upsert; resolves once written
+        record = payload.model_dump(exclude_none=True)
+        # The frontend sends null for omitted lists
+        record.setdefault("insights", [])
+        record.setdefault("memory_chunks", [])
+        success = await get_history_writer().save({"user_id": user_id, **record})
         
         if success:
-            logger.info(f"✅ History saved for user {user_id[:8]}")
+            logger.info("✅ History saved for user %.8s", user_id)
             return {
                 "status": "success",
                 "message": "History saved successfully",
                 "saved": True
             }
         else:
-            logger.warning(f"⚠️  Failed to save history for user {user_id[:8]}")
+            logger.warning("⚠️  Failed to save history for user %.8s", user_id)
             return {
                 "status": "error",
                 "message": "Failed to save history",
@@ -856,43 +1084,62 @@ async def save_search_history(
             }
     
     except Exception as e:
-        logger.error(f"❌ Error saving history: {str(e)}")
+        logger.error("❌ Error saving history: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to save history: {str(e)}"
         )
 
 
-@app.get("/history/{user_id}", tags=["History"])
+# Per-user history pages: never stored by shared caches, and the browser must
+# revalidate (a cheap 304) so a page fetched right after a save is never reused stale
+HISTORY_CACHE_CONTROL = "private, no-cache"
+
+
+def _history_etag(user_id: str, limit: int, start_after, start_after_ts, fields, version) -> str:
+    """ETag for one history page: who/what was asked plus the version of the data"""
+    return '"%s"' % hashlib.blake2b(orjson.dumps([
+        user_id, limit, start_after, start_after_ts, fields, version
+    ]), digest_size=8).hexdigest()
+
+
+@app.get("/history", tags=["History"])
 async def get_search_history(
-    user_id: str,
+    request: Request,
     limit: int = 50,
-    current_user: dict = Depends(get_current_user)
+    start_after: Optional[str] = None,
+    start_after_ts: Optional[float] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    history_manager: PineconeHistoryManager = Depends(get_history_manager)
 ):
     """
-    Get search history for a user
+    Get search history for the authenticated user
+    
+    Cursors only, no offset: pass the previous response's next_cursor
+    (start_after + start_after_ts) to fetch the following page.
+    
+    Responses carry an ETag; a matching If-None-Match gets an empty 304,
+    answered without querying Pinecone while the user's history version
+    (latest timestamp, entry count) is known.
     
     Args:
-        user_id: User ID to fetch history for
+        request: Incoming request (for If-None-Match)
         limit: Maximum number of entries to return
-        current_user: Authenticated user (must match user_id for security)
+        start_after: ID of the last entry already received
+        start_after_ts: created_at of the last entry already received
+        fields: Comma-separated entry fields to return (e.g. "query,response");
+            id, timestamp and created_at are always included. Default: all.
+        current_user: Authenticated user whose history is returned
+        history_manager: Shared history manager
         
     Returns:
-        List of history entries
+        List of history entries and the cursor for the next page (or None)
     """
-    # Security: Users can only view their own history
-    current_user_id = current_user.get("uid")
-    if current_user_id != user_id:
-        logger.warning(f"❌ Unauthorized history access attempt: {current_user_id[:8]} tried to access {user_id[:8]}")
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only view your own search history"
-        )
-    
-    logger.info(f"📖 Fetching search history for user {user_id[:8]}")
+    user_id = current_user.get("uid")
+    logger.info("📖 Fetching search history for user %.8s", user_id)
     
     try:
-        history_manager = get_history_manager()
         if not history_manager:
             logger.warning("⚠️  History manager not available")
             return {
@@ -901,23 +1148,68 @@ async def get_search_history(
                 "history": []
             }
         
-        history = await history_manager.get_search_history(user_id, limit)
+        if_none_match = request.headers.get("if-none-match")
+        version = history_manager.get_history_version(user_id)
+        if if_none_match and version is not None:
+            etag = _history_etag(user_id, limit, start_after, start_after_ts, fields, version)
+            if if_none_match == etag:
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers={"ETag": etag, "Cache-Control": HISTORY_CACHE_CONTROL}
+                )
         
-        logger.info(f"✅ Retrieved {len(history)} history entries for user {user_id[:8]}")
+        history = await history_manager.get_search_history(
+            user_id, limit, start_after=start_after, start_after_ts=start_after_ts,
+            fields=fields.split(",") if fields else None
+        )
+        
+        logger.info("✅ Retrieved %s history entries for user %.8s", len(history), user_id)
         
         # Log details about memory_chunks in response
-        for idx, item in enumerate(history[:3]):  # Log first 3 items
-            logger.info(f"  Entry {idx}: query='{item.get('query', '')[:30]}...', memory_chunks={len(item.get('memory_chunks', []))} chunks")
+        if logger.isEnabledFor(logging.INFO):
+            for idx, item in enumerate(history[:3]):  # Log first 3 items
+                logger.info("  Entry %s: query='%.30s...', memory_chunks=%s chunks", idx, item.get('query', ''), len(item.get('memory_chunks', [])))
         
-        return {
-            "status": "success",
-            "user_id": user_id,
-            "count": len(history),
-            "history": history
-        }
+        # A full page means there may be more; entries without created_at predate cursors
+        next_cursor = None
+        if len(history) == limit and history[-1].get("created_at") is not None:
+            next_cursor = {
+                "start_after": history[-1]["id"],
+                "start_after_ts": history[-1]["created_at"]
+            }
+        
+        if history_manager.is_settling(user_id):
+            # Just after a write this page may still miss it: no validator, no reuse
+            cache_headers = {"Cache-Control": "no-store"}
+        else:
+            # The fetch above records the version when it saw the whole history;
+            # otherwise (cursor pages, cached pages) the page itself identifies it
+            version = history_manager.get_history_version(user_id)
+            if version is None:
+                version = [
+                    "page",
+                    history[0]["timestamp"] if history else None,
+                    history[-1]["id"] if history else None,
+                    len(history)
+                ]
+            etag = _history_etag(user_id, limit, start_after, start_after_ts, fields, version)
+            cache_headers = {"ETag": etag, "Cache-Control": HISTORY_CACHE_CONTROL}
+            if if_none_match == etag:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+        
+        return ORJSONResponse(
+            {
+                "status": "success",
+                "user_id": user_id,
+                "history": history,
+                "count": len(history),
+                "next_cursor": next_cursor
+            },
+            headers=cache_headers
+        )
     
     except Exception as e:
-        logger.error(f"❌ Error fetching history: {str(e)}")
+        logger.error("❌ Error fetching history: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch history: {str(e)}"
@@ -925,13 +1217,14 @@ async def get_search_history(
 
 
 @app.post("/setup/history", tags=["Setup"])
-async def setup_history():
+async def setup_history(
+    history_manager: PineconeHistoryManager = Depends(get_history_manager)
+):
     """
     Test history storage setup (uses Pinecone - FREE)
     This endpoint can be called to test history functionality
     """
     try:
-        history_manager = get_history_manager()
         if not history_manager:
             return {
                 "status": "error",
@@ -958,7 +1251,7 @@ async def setup_history():
                 "status": "success",
                 "message": "History storage (Pinecone) is working correctly!",
                 "storage": "Pinecone (FREE tier)",
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.now(timezone.utc)  # encoded by orjson
             }
         else:
             return {
@@ -967,7 +1260,7 @@ async def setup_history():
             }
         
     except Exception as e:
-        logger.error(f"❌ History setup test failed: {e}")
+        logger.error("❌ History setup test failed: %s", e)
         return {
             "status": "error",
             "message": f"History setup failed: {str(e)}",
@@ -975,35 +1268,27 @@ async def setup_history():
         }
 
 
-@app.delete("/history/{user_id}/{entry_id}", tags=["History"])
+@app.delete("/history/{entry_id}", tags=["History"])
 async def delete_history_entry(
-    user_id: str,
     entry_id: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    history_manager: PineconeHistoryManager = Depends(get_history_manager)
 ):
     """
-    Delete a specific history entry
+    Delete a specific history entry of the authenticated user
     
     Args:
-        user_id: User ID
         entry_id: History entry ID to delete
-        current_user: Authenticated user (must match user_id)
+        current_user: Authenticated user who owns the entry
+        history_manager: Shared history manager
         
     Returns:
         Deletion status
     """
-    # Security: Users can only delete their own history
-    current_user_id = current_user.get("uid")
-    if current_user_id != user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only delete your own history"
-        )
-    
-    logger.info(f"🗑️  Deleting history entry {entry_id} for user {user_id[:8]}")
+    user_id = current_user.get("uid")
+    logger.info("🗑️  Deleting history entry %s for user %.8s", entry_id, user_id)
     
     try:
-        history_manager = get_history_manager()
         if not history_manager:
             return {
                 "status": "warning",
@@ -1014,7 +1299,7 @@ async def delete_history_entry(
         success = await history_manager.delete_history_entry(user_id, entry_id)
         
         if success:
-            logger.info(f"✅ Deleted history entry {entry_id}")
+            logger.info("✅ Deleted history entry %s", entry_id)
             return {
                 "status": "success",
                 "message": "History entry deleted",
@@ -1028,45 +1313,168 @@ async def delete_history_entry(
             }
     
     except Exception as e:
-        logger.error(f"❌ Error deleting history: {str(e)}")
+        logger.error("❌ Error deleting history: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete history: {str(e)}"
         )
 
 
+@app.delete("/history", tags=["History"])
+@app.post("/history/delete", tags=["History"])
+async def delete_history_entries(
+    request: HistoryDeleteRequest,
+    current_user: dict = Depends(get_current_user),
+    history_manager: PineconeHistoryManager = Depends(get_history_manager)
+):
+    """
+    Delete several history entries of the authenticated user in one request
+    
+    Available as DELETE /history and, for clients that can't send a body
+    with DELETE, POST /history/delete.
+    
+    Args:
+        request: IDs of the history entries to delete
+        current_user: Authenticated user who owns the entries
+        history_manager: Shared history manager
+        
+    Returns:
+        Deletion status with the number of entries removed and a per-ID result map
+    """
+    user_id = current_user.get("uid")
+    logger.info("🗑️  Deleting %s history entries for user %.8s", len(request.entry_ids), user_id)
+    
+    try:
+        if not history_manager:
+            return {
+                "status": "warning",
+                "message": "History manager not available",
+                "deleted": 0,
+                "results": {}
+            }
+        
+        results = await history_manager.delete_history_entries(user_id, request.entry_ids)
+        deleted = sum(results.values())
+        
+        return {
+            "status": "success" if deleted == len(results) else "error",
+            "message": f"Deleted {deleted} of {len(results)} history entries",
+            "deleted": deleted,
+            "results": results
+        }
+    
+    except Exception as e:
+        logger.error("❌ Error deleting history: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete history: {str(e)}"
+        )
+
+
+# Deprecated user-scoped history routes, kept for one release. The user now
+# comes from the token; these only point clients at the new paths.
+@app.get("/history/{user_id}", tags=["History"], include_in_schema=False)
+async def get_search_history_legacy(user_id: str, request: Request):
+    """Redirect to GET /history, keeping the query string"""
+    query = request.url.query
+    return RedirectResponse(
+        url=f"/history?{query}" if query else "/history",
+        status_code=status.HTTP_301_MOVED_PERMANENTLY
+    )
+
+
+@app.delete("/history/{user_id}/{entry_id}", tags=["History"], include_in_schema=False)
+async def delete_history_entry_legacy(user_id: str, entry_id: str):
+    """Redirect to DELETE /history/{entry_id} (308 keeps the method)"""
+    return RedirectResponse(
+        url=f"/history/{entry_id}",
+        status_code=status.HTTP_308_PERMANENT_REDIRECT
+    )
+
+
+# Per-probe budget for /system/status; a slower dependency is reported degraded
+SYSTEM_PROBE_TIMEOUT = 0.5
+
+# In-flight /system/status probes by name; a probe that outlives its budget keeps
+# running and is awaited again by later requests instead of starting another thread
+_status_probes: Dict[str, asyncio.Task] = {}
+
+
+def _start_status_probe(name: str, factory) -> asyncio.Task:
+    """Get the in-flight probe task for name, starting one if none is running"""
+    task = _status_probes.get(name)
+    if task is None or task.done():
+        task = asyncio.create_task(factory())
+        # Mark failures as retrieved even if every waiter timed out first
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        _status_probes[name] = task
+    return task
+
+
 @app.get("/system/status", tags=["System"])
-async def system_status():
+async def system_status(
+    history_manager: PineconeHistoryManager = Depends(get_history_manager)
+):
     """
     Get system status and analytics
     
+    Backend probes run concurrently, each bounded by SYSTEM_PROBE_TIMEOUT.
+    A timed-out or error-reporting backend is "degraded"; at most one probe
+    per backend is in flight across requests.
+    
+    Args:
+        history_manager: Shared history manager
+    
     Returns:
         System stats including memory usage, runtime, etc.
     """
     try:
-        stats = {}
+        def _vector_memory_stats():
+            vector_memory = get_vector_memory()
+            get_stats = getattr(vector_memory, "get_collection_stats", None) or vector_memory.get_stats
+            return get_stats()
         
-        if qdrant_memory:
-            qdrant_stats = await qdrant_memory.get_stats()
-            stats["qdrant"] = qdrant_stats
+        probes = {
+            "vector_memory": _start_status_probe(
+                "vector_memory", lambda: asyncio.to_thread(_vector_memory_stats)
+            ),
+            "history": _start_status_probe("history", history_manager.get_stats),
+        }
+        # shield: a timed-out wait must not cancel the shared probe (the worker
+        # thread behind it cannot be interrupted anyway)
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(asyncio.shield(probe), timeout=SYSTEM_PROBE_TIMEOUT)
+                for probe in probes.values()
+            ),
+            return_exceptions=True
+        )
+        
+        stats = {}
+        for name, result in zip(probes, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.warning("⚠️  %s probe exceeded %.1fs", name, SYSTEM_PROBE_TIMEOUT)
+                stats[name] = {"status": "degraded", "error": "timeout"}
+            elif isinstance(result, BaseException):
+                logger.warning("⚠️  %s probe failed: %r", name, result)
+                stats[name] = {"status": "unhealthy", "error": repr(result)}
+            elif not isinstance(result, dict) or "error" in result:
+                # Stats helpers swallow backend errors and return {"error": ...}
+                logger.warning("⚠️  %s probe reported an error: %r", name, result)
+                stats[name] = {"status": "degraded", **(result if isinstance(result, dict) else {})}
+            else:
+                stats[name] = {"status": "healthy", **result}
         
         stats["system"] = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             "version": "3.0.0-phase3",
-            "components": {
-                "orchestrator": orchestrator is not None,
-                "qdrant_memory": qdrant_memory is not None,
-                "followup_agent": followup_agent is not None,
-                "citation_extractor": citation_extractor is not None,
-                "topic_graph_agent": topic_graph_agent is not None,
-                "firebase_auth": firebase_auth is not None and settings.firebase_enabled
-            }
+            "components": _get_component_status()
         }
         
         return stats
     
     except Exception as e:
-        logger.error(f"❌ Failed to get system status: {str(e)}")
+        logger.error("❌ Failed to get system status: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get system status: {str(e)}"
@@ -1076,16 +1484,23 @@ async def system_status():
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """
-    Global exception handler for unhandled exceptions
+    Last-resort handler for unhandled exceptions
+    
+    HTTPException and validation errors never reach here; Starlette handles
+    them first. Full tracebacks are only formatted in debug mode so an error
+    storm in production doesn't turn into a CPU storm.
     """
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+    if settings.debug:
+        logger.error("Unhandled exception: %s", exc, exc_info=True)
+    else:
+        logger.error("Unhandled %s on %s %s", type(exc).__name__, request.method, request.url.path)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "status": "error",
             "error": "Internal server error",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }
     )
 
@@ -1098,5 +1513,12 @@ if __name__ == "__main__":
         host=settings.backend_host,
         port=settings.backend_port,
         reload=settings.debug,
-        log_level="info"
+        # C event loop and HTTP parser (both ship with uvicorn[standard])
+        loop="uvloop",
+        http="httptools",
+        # One process: the history page cache, its invalidation and the
+        # embedding model are per-process state (same as run.py / render_start.py)
+        workers=1,
+        log_level="info",
+        access_log=settings.debug  # app logs already cover each request in production
     )
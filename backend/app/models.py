@@ -2,7 +2,7 @@
 Models for API requests and responses
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -73,6 +73,21 @@ class HealthResponse(BaseModel):
     agents_ready: Dict[str, bool]
 
 
+class SaveHistoryRequest(BaseModel):
+    """Request model for saving a search to history"""
+    query: str = Field(max_length=4000)
+    response: str = Field(max_length=200_000)
+    sources: Optional[List[Dict[str, Any]]] = Field(default=None, max_length=100)  # defaults to search_results
+    search_results: Optional[List[Dict[str, Any]]] = Field(default=None, max_length=100)
+    insights: Optional[List[str]] = Field(default=None, max_length=50)
+    memory_chunks: Optional[List[Any]] = Field(default=None, max_length=50)  # chunk dicts or plain strings
+
+
+class HistoryDeleteRequest(BaseModel):
+    """Request model for bulk history deletion"""
+    entry_ids: List[str] = Field(max_length=1000)  # one Pinecone delete batch
+
+
 class ErrorResponse(BaseModel):
     """Error response model"""
     query: Optional[str] = None
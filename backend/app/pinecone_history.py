@@ -3,19 +3,102 @@ Pinecone-based History Manager
 Stores user search history in Pinecone vector database (FREE tier compatible)
 No billing required - uses existing Pinecone setup
 """
+import asyncio
+import functools
 import os
-import json
+import orjson
 import hashlib
 import logging
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+import time
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Sequence
+from cachetools import LRUCache, TTLCache
 from pinecone import Pinecone, ServerlessSpec
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+
+try:
+    from pinecone.exceptions import ServiceException
+except ImportError:  # older/newer SDK layouts; 5xx is still caught via .status
+    ServiceException = ConnectionError
+
+# Errors worth retrying regardless of status: dropped/refused connections and
+# timeouts (builtin or raised by urllib3 under Pinecone's REST client) and 5xx
+_TRANSIENT_ERRORS = (ConnectionError, TimeoutError, Urllib3HTTPError, ServiceException)
 
 logger = logging.getLogger(__name__)
 
 # History namespace in Pinecone
 HISTORY_NAMESPACE = "user-history"
 
+# Background writer: flush when this many records are queued or after this wait
+# (kept short since /history/save callers await their batch)
+HISTORY_MAX_BATCH = 40
+HISTORY_MAX_WAIT = 0.03
+
+# Upsert retries on transient errors: exponential backoff from INITIAL,
+# capped at MAX per sleep, giving up once DEADLINE seconds have passed
+HISTORY_RETRY_INITIAL = 0.1
+HISTORY_RETRY_MAX = 2.0
+HISTORY_RETRY_MULTIPLIER = 2.0
+HISTORY_RETRY_DEADLINE = 10.0
+
+# Max history upserts in flight at once (worker threads / client connections)
+HISTORY_MAX_CONCURRENT_WRITES = 8
+
+# Pinecone accepts at most this many ids per delete call
+HISTORY_DELETE_BATCH = 1000
+
+# Ids per fetch call when checking entry ownership (fetch ids go in the URL)
+HISTORY_FETCH_BATCH = 100
+
+# Matches fetched per history page query (Pinecone's top_k limit with metadata).
+# Every history vector is identical, so scores tie and the order is arbitrary:
+# the newest entries are found by sorting this candidate set, which is exact
+# while a user has at most this many entries at or before the cursor.
+HISTORY_QUERY_CAP = 1000
+
+# Per-entry metadata budget in bytes of JSON (Pinecone rejects vectors over 40 KB);
+# insight strings are cut to INSIGHT_MAX_CHARS before the budget is applied
+HISTORY_METADATA_MAX_BYTES = 38_000
+HISTORY_INSIGHT_MAX_CHARS = 500
+
+# Fields a history entry can carry, and the JSON-encoded ones among them
+# (entry field -> metadata key; search_results is stored as sources)
+HISTORY_FIELDS = (
+    "query", "response", "sources", "insights", "memory_chunks",
+    "search_results", "sources_count"
+)
+_JSON_HISTORY_FIELDS = {
+    "sources": "sources",
+    "insights": "insights",
+    "memory_chunks": "memory_chunks",
+    "search_results": "sources",
+}
+
+# Cached history pages: at most this many, each reused for this many seconds
+# (worst case ~4096 pages x ~50 KB = ~200 MB)
+HISTORY_CACHE_SIZE = 4096
+HISTORY_CACHE_TTL = 45
+
+# Pinecone reads are eventually consistent: for this many seconds after a
+# user's write, their reads may miss it, so nothing read then is cached
+HISTORY_WRITE_SETTLE = 5.0
+
+def _parse_json_field(value) -> Any:
+    """Decode a JSON-encoded metadata field, falling back to an empty list"""
+    if value is None or value == "":
+        return []
+    if isinstance(value, (list, dict)):
+        return value
+    if isinstance(value, str):
+        try:
+            return orjson.loads(value)
+        except (orjson.JSONDecodeError, TypeError):
+            logger.debug("Failed to parse JSON: %s", value)
+    return []
+
+
 class PineconeHistoryManager:
     """Manages user search history in Pinecone (FREE - no billing required)"""
     
@@ -34,6 +117,30 @@ class PineconeHistoryManager:
         self.index = None
         self.embedding_dim = 384  # Same as other Pinecone data
         
+        # Bounds concurrent upserts so bursts can't exhaust threads or connections
+        self._write_semaphore = asyncio.Semaphore(HISTORY_MAX_CONCURRENT_WRITES)
+        
+        # (user_id, limit, start_after, start_after_ts) -> history page; dropped
+        # for a user on every write. The per-user generation is bumped on each
+        # write so a read that raced one is not cached.
+        self._history_cache = TTLCache(maxsize=HISTORY_CACHE_SIZE, ttl=HISTORY_CACHE_TTL)
+        self._history_generation = LRUCache(maxsize=HISTORY_CACHE_SIZE)
+        
+        # Users who wrote within HISTORY_WRITE_SETTLE seconds (entries expire by themselves)
+        self._recent_writes = TTLCache(maxsize=HISTORY_CACHE_SIZE, ttl=HISTORY_WRITE_SETTLE)
+        
+        # user_id -> (latest timestamp, entry count) seen by the last settled
+        # first-page query, or a fresh write marker; lets callers validate ETags
+        # without querying
+        self._history_versions = TTLCache(maxsize=HISTORY_CACHE_SIZE, ttl=HISTORY_CACHE_TTL)
+        
+        # Dedicated pool for blocking Pinecone calls so history I/O never
+        # competes with embeddings and other work on the loop's default executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=HISTORY_MAX_CONCURRENT_WRITES,
+            thread_name_prefix="pinecone-history"
+        )
+        
         self._initialize()
     
     def _initialize(self):
@@ -45,12 +152,91 @@ class PineconeHistoryManager:
             
             self.pc = Pinecone(api_key=self.api_key)
             self.index = self.pc.Index(self.index_name)
-            logger.info(f"✅ Pinecone history manager initialized (namespace: {self.namespace})")
+            logger.info("✅ Pinecone history manager initialized (namespace: %s)", self.namespace)
             
         except Exception as e:
-            logger.error(f"❌ Failed to initialize Pinecone history: {e}")
+            logger.error("❌ Failed to initialize Pinecone history: %s", e)
             self.index = None
     
+    async def _run_blocking(self, func, *args, **kwargs):
+        """
+        Run a blocking Pinecone call on the history thread pool
+        
+        Args:
+            func: Synchronous callable (e.g. self.index.upsert)
+            *args, **kwargs: Arguments forwarded to func
+            
+        Returns:
+            Whatever func returns
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """True for errors worth retrying: throttling, 5xx and dropped connections"""
+        status = getattr(error, "status", None)
+        if isinstance(status, int):
+            return status == 429 or status >= 500
+        return isinstance(error, _TRANSIENT_ERRORS)
+    
+    async def _upsert(self, vectors: List[Dict[str, Any]]):
+        """
+        Upsert vectors on the history pool, retrying transient failures
+        
+        Args:
+            vectors: Pinecone vectors to write
+            
+        Raises:
+            Exception: The last error once it is permanent or the deadline passes
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + HISTORY_RETRY_DEADLINE
+        delay = HISTORY_RETRY_INITIAL
+        while True:
+            try:
+                async with self._write_semaphore:
+                    return await self._run_blocking(self.index.upsert, vectors=vectors, namespace=self.namespace)
+            except Exception as e:
+                if not self._is_transient(e) or loop.time() + delay > deadline:
+                    raise
+                logger.debug("History upsert failed (%s), retrying in %.1fs", e, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * HISTORY_RETRY_MULTIPLIER, HISTORY_RETRY_MAX)
+    
+    def shutdown(self):
+        """Stop the history thread pool, waiting for in-flight calls to finish"""
+        self._executor.shutdown(wait=True)
+    
+    def _invalidate_history(self, user_id: str):
+        """Drop a user's cached history pages after a write"""
+        self._history_generation[user_id] = self._history_generation.get(user_id, 0) + 1
+        # New version right away (wall clock keeps it unique across restarts), so
+        # no ETag issued before the write can validate afterwards
+        self._history_versions[user_id] = ("write", time.time())
+        self._recent_writes[user_id] = True
+        for key in [key for key in self._history_cache if key[0] == user_id]:
+            self._history_cache.pop(key, None)
+    
+    def is_settling(self, user_id: str) -> bool:
+        """True while a user's last write may not yet be visible to Pinecone reads"""
+        return user_id in self._recent_writes
+    
+    def get_history_version(self, user_id: str) -> Optional[tuple]:
+        """
+        Get a user's current history version without querying Pinecone
+        
+        Args:
+            user_id: User's unique ID
+            
+        Returns:
+            (latest entry timestamp, entry count) or a write marker; None if not
+            known recently or while the user's last write is still settling
+        """
+        if self.is_settling(user_id):
+            return None
+        return self._history_versions.get(user_id)
+    
     def _generate_id(self, user_id: str, query: str, timestamp: str) -> str:
         """Generate unique ID for history entry"""
         content = f"{user_id}_{query}_{timestamp}"
@@ -68,7 +254,7 @@ class PineconeHistoryManager:
         user_id: str, 
         query: str, 
         response: str, 
-        sources: List[Dict[str, Any]],
+        sources: Optional[List[Dict[str, Any]]] = None,
         search_results: Optional[List[Dict]] = None,
         insights: Optional[List[str]] = None,
         memory_chunks: Optional[List[Dict]] = None
@@ -80,7 +266,7 @@ class PineconeHistoryManager:
             user_id: User's unique ID
             query: Search query
             response: AI-generated response/summary
-            sources: List of source URLs and titles
+            sources: List of source URLs and titles (defaults to search_results)
             search_results: Raw search results (optional)
             insights: Key insights (optional)
             memory_chunks: Related memory chunks (optional)
@@ -89,77 +275,203 @@ class PineconeHistoryManager:
             bool: True if saved successfully
         """
         if not self.index or not user_id:
-            logger.debug(f"History save skipped: index={bool(self.index)}, user_id={bool(user_id)}")
+            logger.debug("History save skipped: index=%s, user_id=%s", bool(self.index), bool(user_id))
             return False
         
         try:
-            timestamp = datetime.utcnow().isoformat()
-            vector_id = self._generate_id(user_id, query, timestamp)
-            
-            # Process memory chunks to preserve structure while limiting size
-            processed_chunks = []
-            if memory_chunks:
-                for chunk in memory_chunks[:3]:  # Only store first 3
-                    if isinstance(chunk, str):
-                        # If it's a string, create a minimal chunk object
-                        processed_chunks.append({
-                            "content": chunk[:300],  # Truncate content
-                            "metadata": {},
-                            "similarity": 0
-                        })
-                    elif isinstance(chunk, dict):
-                        # If it's a dict, preserve structure
-                        processed_chunks.append({
-                            "content": str(chunk.get("content", ""))[:300],
-                            "metadata": chunk.get("metadata", {}),
-                            "similarity": chunk.get("similarity", 0)
-                        })
-            
-            # Prepare metadata (Pinecone has 40KB limit per vector)
-            # Truncate long fields to fit
-            metadata = {
-                "type": "search_history",
-                "user_id": user_id,
-                "query": query[:500],  # Limit query length
-                "response": response[:3000],  # Limit response length
-                "sources": json.dumps(sources[:10]),  # Limit sources
-                "insights": json.dumps((insights or [])[:5]),  # Limit insights
-                "memory_chunks": json.dumps(processed_chunks),  # Store processed chunks
-                "timestamp": timestamp,
-                "sources_count": len(sources),
-            }
-            
-            # Create dummy embedding (history doesn't need semantic search)
-            embedding = self._create_dummy_embedding()
-            
-            # Upsert to Pinecone
-            self.index.upsert(
-                vectors=[{
-                    "id": vector_id,
-                    "values": embedding,
-                    "metadata": metadata
-                }],
-                namespace=self.namespace
+            vector = self._build_history_vector(
+                user_id, query, response, sources, search_results, insights, memory_chunks
             )
             
-            logger.info(f"✅ Saved search history for user {user_id[:8]}... (id: {vector_id[:12]}...)")
+            # Upsert to Pinecone off the event loop
+            await self._upsert([vector])
+            self._invalidate_history(user_id)
+            
+            logger.info("✅ Saved search history for user %.8s... (id: %.12s...)", user_id, vector['id'])
             return True
             
         except Exception as e:
-            logger.debug(f"History save failed: {e}")
+            logger.debug("History save failed: %s", e)
             return False
     
+    async def save_search_history_batch(self, records: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Save several history entries with a single Pinecone upsert
+        
+        If the batch upsert fails permanently (e.g. one oversized record), each
+        entry is retried on its own so one bad record can't fail its neighbours.
+        
+        Args:
+            records: Keyword dicts accepted by save_search_history
+            
+        Returns:
+            Per-record success flags, in the order of records
+        """
+        outcome = [False] * len(records)
+        if not self.index:
+            logger.debug("History batch save skipped: index unavailable")
+            return outcome
+        
+        # Position in records -> vector; records without a user_id are never written
+        vectors: Dict[int, Dict[str, Any]] = {}
+        for position, record in enumerate(records):
+            if not record.get("user_id"):
+                continue
+            try:
+                vectors[position] = self._build_history_vector(**record)
+            except Exception as e:
+                logger.debug("History record skipped: %s", e)
+        if not vectors:
+            return outcome
+        
+        try:
+            # One round trip for the whole batch, off the event loop
+            await self._upsert(list(vectors.values()))
+            for position in vectors:
+                outcome[position] = True
+        except Exception as e:
+            if self._is_transient(e):
+                logger.debug("History batch save failed: %s", e)
+            else:
+                logger.debug("History batch save failed (%s), retrying entries individually", e)
+                results = await asyncio.gather(
+                    *(self._upsert([vector]) for vector in vectors.values()),
+                    return_exceptions=True
+                )
+                for position, result in zip(vectors, results):
+                    if isinstance(result, Exception):
+                        logger.debug("History save failed: %s", result)
+                    else:
+                        outcome[position] = True
+        
+        for user_id in {vector["metadata"]["user_id"] for vector in vectors.values()}:
+            self._invalidate_history(user_id)
+        
+        logger.info("✅ Saved %s of %s history entries in one batch", sum(outcome), len(vectors))
+        return outcome
+    
+    def _build_history_vector(
+        self,
+        user_id: str,
+        query: str,
+        response: str,
+        sources: Optional[List[Dict[str, Any]]] = None,
+        search_results: Optional[List[Dict]] = None,
+        insights: Optional[List[str]] = None,
+        memory_chunks: Optional[List[Dict]] = None
+    ) -> Dict[str, Any]:
+        """Build the Pinecone vector (id, dummy values, truncated metadata) for one entry"""
+        now = datetime.now(timezone.utc)
+        timestamp = now.isoformat()
+        vector_id = self._generate_id(user_id, query, timestamp)
+        
+        # Callers pass the search results once; they double as the stored sources
+        if sources is None:
+            sources = search_results or []
+        
+        # Process memory chunks to preserve structure while limiting size;
+        # repeated chunk texts (same source passage) are stored once
+        processed_chunks = []
+        seen_chunks = set()
+        for chunk in memory_chunks or []:
+            if len(processed_chunks) == 3:  # Only store first 3
+                break
+            if isinstance(chunk, str):
+                # If it's a string, create a minimal chunk object
+                processed = {
+                    "content": chunk[:300],  # Truncate content
+                    "metadata": {},
+                    "similarity": 0
+                }
+            elif isinstance(chunk, dict):
+                # If it's a dict, preserve structure
+                processed = {
+                    "content": str(chunk.get("content", ""))[:300],
+                    "metadata": chunk.get("metadata", {}),
+                    "similarity": chunk.get("similarity", 0)
+                }
+            else:
+                continue
+            if processed["content"] in seen_chunks:
+                continue
+            seen_chunks.add(processed["content"])
+            processed_chunks.append(processed)
+        
+        # Same URL returned by several searches: keep its first occurrence
+        seen_urls = set()
+        unique_sources = []
+        for source in sources:
+            url = source.get("url") if isinstance(source, dict) else None
+            if url:
+                if url in seen_urls:
+                    continue
+                seen_urls.add(url)
+            unique_sources.append(source)
+        
+        # Prepare metadata (Pinecone has 40KB limit per vector)
+        # Truncate long fields to fit
+        kept_sources = unique_sources[:10]  # Limit sources
+        kept_insights = [str(insight)[:HISTORY_INSIGHT_MAX_CHARS] for insight in (insights or [])[:5]]
+        metadata = {
+            "type": "search_history",
+            "user_id": user_id,
+            "query": query[:500],  # Limit query length
+            "response": response[:3000],  # Limit response length
+            "timestamp": timestamp,
+            "created_at": now.timestamp(),  # numeric copy for range-filter cursors
+            "sources_count": len(unique_sources),
+        }
+        
+        # Source and chunk dicts are caller-shaped and unbounded: drop the
+        # least useful items (chunks, then trailing sources, then insights)
+        # until the encoded metadata fits the budget
+        while True:
+            metadata["sources"] = orjson.dumps(kept_sources).decode()
+            metadata["insights"] = orjson.dumps(kept_insights).decode()
+            metadata["memory_chunks"] = orjson.dumps(processed_chunks).decode()
+            if len(orjson.dumps(metadata)) <= HISTORY_METADATA_MAX_BYTES:
+                break
+            if processed_chunks:
+                processed_chunks.pop()
+            elif kept_sources:
+                kept_sources.pop()
+            elif kept_insights:
+                kept_insights.pop()
+            else:
+                break
+        
+        # Create dummy embedding (history doesn't need semantic search)
+        embedding = self._create_dummy_embedding()
+        
+        return {
+            "id": vector_id,
+            "values": embedding,
+            "metadata": metadata
+        }
+    
     async def get_search_history(
         self, 
         user_id: str, 
-        limit: int = 20
+        limit: int = 20,
+        start_after: Optional[str] = None,
+        start_after_ts: Optional[float] = None,
+        fields: Optional[Sequence[str]] = None
     ) -> List[Dict[str, Any]]:
         """
-        Get user's search history
+        Get user's search history, one cursor-delimited page at a time
+        
+        Pages are sought with a created_at range filter instead of skipping
+        entries, so fetching a later page costs the same as the first. Up to
+        HISTORY_QUERY_CAP candidates are fetched and ordered by (created_at, id)
+        here, since the similarity query itself returns them in no useful order.
         
         Args:
             user_id: User's unique ID
             limit: Maximum number of entries to return
+            start_after: ID of the last entry of the previous page
+            start_after_ts: created_at of the last entry of the previous page
+            fields: Entry fields to return (see HISTORY_FIELDS; default all).
+                id, timestamp and created_at are always included.
             
         Returns:
             List of history entries sorted by timestamp (newest first)
@@ -167,82 +479,210 @@ class PineconeHistoryManager:
         if not self.index or not user_id:
             return []
         
+        wanted = HISTORY_FIELDS if fields is None else tuple(f for f in HISTORY_FIELDS if f in fields)
+        
+        cache_key = (user_id, limit, start_after, start_after_ts, wanted)
+        cached = self._history_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        generation = self._history_generation.get(user_id, 0)
+        
         try:
             # Query with dummy vector and filter by user_id
             # Pinecone filter syntax uses $eq for equality
-            results = self.index.query(
+            conditions = [
+                {"user_id": {"$eq": user_id}},
+                {"type": {"$eq": "search_history"}}
+            ]
+            if start_after_ts is not None:
+                # $lte keeps same-instant siblings; the cursor entry itself is dropped below
+                conditions.append({"created_at": {"$lte": start_after_ts}})
+            
+            # All scores tie on the dummy vector, so top_k must cover the whole
+            # candidate set for the sort below to find the newest entries
+            results = await self._run_blocking(
+                self.index.query,
                 vector=self._create_dummy_embedding(),
-                top_k=limit * 2,  # Get more to filter
+                top_k=HISTORY_QUERY_CAP,
                 include_metadata=True,
                 namespace=self.namespace,
-                filter={
-                    "$and": [
-                        {"user_id": {"$eq": user_id}},
-                        {"type": {"$eq": "search_history"}}
-                    ]
-                }
+                filter={"$and": conditions}
             )
             
-            logger.info(f"📜 Pinecone query returned {len(results.matches)} matches for user {user_id[:8]}...")
+            logger.info("📜 Pinecone query returned %s matches for user %.8s...", len(results.matches), user_id)
+            
+            # Entries saved before created_at existed sort last, by timestamp
+            def sort_key(match):
+                meta = match.metadata
+                return (meta.get("created_at") or 0, meta.get("timestamp", ""), match.id)
+            
+            # Keyset cursor: strictly after (start_after_ts, start_after) in newest-first order
+            if start_after_ts is not None and start_after is not None:
+                cursor = (start_after_ts, start_after)
+                candidates = (
+                    match for match in results.matches
+                    if (match.metadata.get("created_at") or 0, match.id) < cursor
+                )
+            else:
+                candidates = (match for match in results.matches if match.id != start_after)
+            
+            # Newest first; only the kept page is parsed, and only the wanted fields
+            matches = sorted(candidates, key=sort_key, reverse=True)[:limit]
             
-            # Parse results
             history = []
-            for match in results.matches:
+            for match in matches:
                 meta = match.metadata
-                
-                # Helper function to safely parse JSON
-                def safe_json_parse(value, default=None):
-                    if default is None:
-                        default = []
-                    if value is None or value == "":
-                        return default
-                    if isinstance(value, (list, dict)):
-                        return value
-                    if isinstance(value, str):
-                        try:
-                            return json.loads(value)
-                        except (json.JSONDecodeError, TypeError):
-                            logger.debug(f"Failed to parse JSON: {value}")
-                            return default
-                    return default
-                
                 entry = {
                     "id": match.id,
-                    "query": meta.get("query", ""),
-                    "response": meta.get("response", ""),
-                    "sources": safe_json_parse(meta.get("sources")),
-                    "insights": safe_json_parse(meta.get("insights")),
-                    "memory_chunks": safe_json_parse(meta.get("memory_chunks")),
-                    "search_results": safe_json_parse(meta.get("sources")),
                     "timestamp": meta.get("timestamp", ""),
-                    "sources_count": meta.get("sources_count", 0),
+                    "created_at": meta.get("created_at"),
                 }
-                
-                logger.debug(f"Parsed history entry - Query: {entry['query'][:50]}..., Memory chunks: {len(entry['memory_chunks'])}")
+                for field in wanted:
+                    source_key = _JSON_HISTORY_FIELDS.get(field)
+                    if source_key is not None:
+                        entry[field] = _parse_json_field(meta.get(source_key))
+                    elif field == "sources_count":
+                        entry[field] = meta.get("sources_count", 0)
+                    else:
+                        entry[field] = meta.get(field, "")
                 history.append(entry)
             
-            # Sort by timestamp (newest first)
-            history.sort(key=lambda x: x["timestamp"], reverse=True)
+            # A read racing a write, or right after one, may be stale: don't keep it
+            if self._history_generation.get(user_id, 0) == generation and not self.is_settling(user_id):
+                self._history_cache[cache_key] = history
+                if start_after is None and start_after_ts is None:
+                    # An uncursored query saw every entry (up to the cap)
+                    self._history_versions[user_id] = (
+                        max((match.metadata.get("timestamp", "") for match in results.matches), default=""),
+                        len(results.matches)
+                    )
             
-            logger.info(f"Returning {len(history[:limit])} history entries")
-            return history[:limit]
+            logger.info("Returning %s history entries", len(history))
+            return history
             
         except Exception as e:
-            logger.debug(f"History fetch failed: {e}")
+            logger.debug("History fetch failed: %s", e)
             return []
     
+    async def get_stats(self) -> Dict[str, Any]:
+        """
+        Get history namespace statistics from Pinecone
+        
+        Returns:
+            Dict with the namespace name and its stored entry count
+        """
+        if not self.index:
+            return {"namespace": self.namespace, "available": False}
+        
+        stats = await self._run_blocking(self.index.describe_index_stats)
+        namespace_stats = stats.namespaces.get(self.namespace)
+        return {
+            "namespace": self.namespace,
+            "available": True,
+            "entries": namespace_stats.vector_count if namespace_stats else 0
+        }
+    
     async def delete_history_entry(self, user_id: str, entry_id: str) -> bool:
-        """Delete a specific history entry"""
+        """Delete a specific history entry (only if it belongs to user_id)"""
         if not self.index:
             return False
         
+        results = await self.delete_history_entries(user_id, [entry_id])
+        return results.get(entry_id, False)
+    
+    async def _owned_entry_ids(self, user_id: str, entry_ids: List[str]) -> set:
+        """
+        Fetch entries and keep the IDs stored under user_id
+        
+        The history namespace is shared by all users, so caller-supplied IDs
+        must be checked before they are deleted.
+        
+        Args:
+            user_id: User's unique ID
+            entry_ids: Candidate history entry IDs
+            
+        Returns:
+            Subset of entry_ids that exist and belong to user_id
+        """
+        batches = [
+            entry_ids[start:start + HISTORY_FETCH_BATCH]
+            for start in range(0, len(entry_ids), HISTORY_FETCH_BATCH)
+        ]
+        responses = await asyncio.gather(
+            *(self._run_blocking(self.index.fetch, ids=batch, namespace=self.namespace)
+              for batch in batches)
+        )
+        
+        owned = set()
+        for response in responses:
+            for vector_id, vector in response.vectors.items():
+                if (vector.metadata or {}).get("user_id") == user_id:
+                    owned.add(vector_id)
+        return owned
+    
+    async def delete_history_entries(self, user_id: str, entry_ids: List[str]) -> Dict[str, bool]:
+        """
+        Delete several history entries of one user, one Pinecone call per id batch
+        
+        IDs that don't exist or belong to another user are reported as not
+        deleted and left untouched.
+        
+        Args:
+            user_id: User's unique ID
+            entry_ids: History entry IDs to delete
+            
+        Returns:
+            Map of entry ID -> whether it was deleted
+        """
+        entry_ids = list(dict.fromkeys(entry_ids))
+        if not self.index or not entry_ids or not user_id:
+            return {entry_id: False for entry_id in entry_ids}
+        
         try:
-            self.index.delete(ids=[entry_id], namespace=self.namespace)
-            logger.info(f"✅ Deleted history entry {entry_id}")
-            return True
+            owned = await self._owned_entry_ids(user_id, entry_ids)
         except Exception as e:
-            logger.debug(f"History delete failed: {e}")
-            return False
+            logger.debug("History ownership check failed: %s", e)
+            return {entry_id: False for entry_id in entry_ids}
+        
+        outcome = dict.fromkeys(entry_ids, False)
+        if len(owned) < len(entry_ids):
+            logger.warning("⚠️ Skipping %s history ids not owned by user %.8s...", len(entry_ids) - len(owned), user_id)
+        if owned:
+            outcome.update(await self._delete_ids(user_id, [entry_id for entry_id in entry_ids if entry_id in owned]))
+        return outcome
+    
+    async def _delete_ids(self, user_id: str, entry_ids: List[str]) -> Dict[str, bool]:
+        """
+        Delete already-verified entry IDs; batches are issued concurrently on the history pool
+        
+        Args:
+            user_id: Owner of the entries (for cache invalidation)
+            entry_ids: History entry IDs known to belong to user_id
+            
+        Returns:
+            Map of entry ID -> whether its delete call succeeded
+        """
+        batches = [
+            entry_ids[start:start + HISTORY_DELETE_BATCH]
+            for start in range(0, len(entry_ids), HISTORY_DELETE_BATCH)
+        ]
+        results = await asyncio.gather(
+            *(self._run_blocking(self.index.delete, ids=batch, namespace=self.namespace)
+              for batch in batches),
+            return_exceptions=True
+        )
+        
+        self._invalidate_history(user_id)
+        
+        outcome = {}
+        for batch, result in zip(batches, results):
+            failed = isinstance(result, Exception)
+            if failed:
+                logger.debug("History batch delete failed: %s", result)
+            outcome.update(dict.fromkeys(batch, not failed))
+        
+        logger.info("✅ Deleted %s history entries for user %.8s...", sum(outcome.values()), user_id)
+        return outcome
     
     async def clear_user_history(self, user_id: str) -> bool:
         """Clear all history for a user"""
@@ -250,20 +690,144 @@ class PineconeHistoryManager:
             return False
         
         try:
-            # Get all user's history entries
-            history = await self.get_search_history(user_id, limit=1000)
+            # Get all user's history entry IDs (no other fields needed)
+            history = await self.get_search_history(user_id, limit=1000, fields=())
             
             if history:
+                # IDs come from a user_id-filtered query, so no ownership fetch needed
                 ids = [entry["id"] for entry in history]
-                self.index.delete(ids=ids, namespace=self.namespace)
-                logger.info(f"✅ Cleared {len(ids)} history entries for user {user_id[:8]}...")
+                return all((await self._delete_ids(user_id, ids)).values())
             
             return True
         except Exception as e:
-            logger.debug(f"History clear failed: {e}")
+            logger.debug("History clear failed: %s", e)
             return False
 
 
+# Queued by HistoryBatchWriter.stop(): the consumer flushes what it holds and exits
+_STOP = object()
+
+
+class HistoryBatchWriter:
+    """
+    Background writer that coalesces history saves into batched upserts
+    Flushes after HISTORY_MAX_BATCH records or HISTORY_MAX_WAIT seconds
+    
+    put() is fire-and-forget; save() waits for its batch and reports the outcome.
+    """
+    
+    def __init__(self, max_batch: int = HISTORY_MAX_BATCH, max_wait: float = HISTORY_MAX_WAIT):
+        """
+        Initialize the writer (call start() from a running event loop)
+        
+        Args:
+            max_batch: Max records per upsert
+            max_wait: Seconds to wait for more records after the first one
+        """
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the consumer task"""
+        if self._task is None or self._task.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+            logger.info("💾 History batch writer started")
+    
+    async def put(self, record: Dict[str, Any]):
+        """
+        Queue a history entry (keyword dict for save_search_history)
+        
+        Args:
+            record: History entry fields
+        """
+        if self._queue is None:
+            self.start()
+        await self._queue.put((record, None))
+    
+    async def save(self, record: Dict[str, Any]) -> bool:
+        """
+        Queue a history entry and wait until its batch has been written
+        
+        Args:
+            record: History entry fields
+            
+        Returns:
+            bool: True if the entry was saved
+        """
+        if self._queue is None:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+    
+    async def _run(self):
+        """Consume the queue, one batched upsert per flush, until the stop sentinel"""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stopping = False
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+            if stopping:
+                return
+    
+    async def _flush(self, batch: List[tuple]):
+        """Write one batch (the upsert retries transient errors); failures are logged, never raised"""
+        try:
+            outcome = await get_pinecone_history_manager().save_search_history_batch(
+                [record for record, _ in batch]
+            )
+        except Exception as e:
+            logger.debug("History batch flush failed: %s", e)
+            outcome = [False] * len(batch)
+        
+        # Each waiting caller gets its own record's outcome
+        for (record, future), saved in zip(batch, outcome):
+            if future is not None and not future.done():
+                future.set_result(saved)
+    
+    async def stop(self):
+        """Stop the consumer once its current batch is written, then flush anything still queued"""
+        if self._task is not None:
+            if not self._task.done():
+                # Not cancel(): records already taken off the queue would be lost
+                await self._queue.put(_STOP)
+            try:
+                await self._task
+            except Exception as e:
+                logger.debug("History batch writer exited with error: %s", e)
+            self._task = None
+        
+        if self._queue is not None:
+            remaining = []
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not _STOP:
+                    remaining.append(item)
+            for start in range(0, len(remaining), self.max_batch):
+                await self._flush(remaining[start:start + self.max_batch])
+            if remaining:
+                logger.info("💾 Flushed %s queued history entries on shutdown", len(remaining))
+
+
 # Singleton instance
 _history_manager = None
 
@@ -273,3 +837,13 @@ def get_pinecone_history_manager() -> PineconeHistoryManager:
     if _history_manager is None:
         _history_manager = PineconeHistoryManager()
     return _history_manager
+
+
+_history_writer: Optional[HistoryBatchWriter] = None
+
+def get_history_writer() -> HistoryBatchWriter:
+    """Get or create singleton history batch writer"""
+    global _history_writer
+    if _history_writer is None:
+        _history_writer = HistoryBatchWriter()
+    return _history_writer
@@ -39,7 +39,10 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=False,
+        loop="uvloop",
+        http="httptools",
         log_level="info",
+        access_log=False,
         workers=1,
         timeout_keep_alive=60,
         limit_concurrency=5,
@@ -40,7 +40,10 @@ if __name__ == "__main__":
             host=host,
             port=port,
             reload=reload_mode,
+            loop="uvloop",
+            http="httptools",
             log_level="info",
+            access_log=reload_mode,
             workers=1  # Single worker for Render free tier
         )
     except KeyError as e:
@@ -0,0 +1,6 @@
+"""Make the backend package importable as "app" when running pytest from backend/"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,67 @@
+"""
+MemoryAgent against WeaviateMemory: query_memory -> format_memory_context
+Weaviate itself is faked; only the result shapes matter here
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("weaviate")
+
+from app.agents.memory_agent import MemoryAgent
+from app.agents.weaviate_memory import WeaviateMemory
+
+
+class _FakeEmbedder:
+    def encode(self, text):
+        return [0.1, 0.2, 0.3]
+
+
+def _obj(properties, **metadata):
+    return SimpleNamespace(properties=properties, metadata=SimpleNamespace(**metadata))
+
+
+def _make_memory(chunk_objects, topic_objects):
+    """A WeaviateMemory with its collections replaced by canned query results"""
+    memory = object.__new__(WeaviateMemory)
+    memory._initialized = False
+    WeaviateMemory.__init__(memory)
+    memory.client = object()  # marks the memory as connected
+    memory.research_chunks = SimpleNamespace(query=SimpleNamespace(
+        hybrid=lambda **kwargs: SimpleNamespace(objects=chunk_objects)
+    ))
+    memory.topic_memory = SimpleNamespace(query=SimpleNamespace(
+        near_vector=lambda **kwargs: SimpleNamespace(objects=topic_objects)
+    ))
+    return memory
+
+
+def test_query_memory_feeds_format_memory_context():
+    memory = _make_memory(
+        chunk_objects=[_obj(
+            {"content": "Fusion output doubled in 2025.", "title": "Fusion News",
+             "url": "https://example.com/fusion", "source_domain": "example.com",
+             "query": "fusion", "chunk_index": 0},
+            score=0.8
+        )],
+        topic_objects=[_obj(
+            {"summary": "Earlier fusion research summary", "query": "fusion progress",
+             "timestamp": "2025-01-01T00:00:00+00:00", "insights_count": 2,
+             "sources_count": 3, "key_findings": ""},
+            distance=0.25
+        )],
+    )
+    agent = MemoryAgent(embedder=_FakeEmbedder(), vector_memory=memory)
+    
+    chunks = agent.query_memory("fusion")
+    memories = agent.query_topic_memory("fusion")
+    context = agent.format_memory_context(chunks, memories)
+    
+    assert chunks[0]["content"] == "Fusion output doubled in 2025."
+    assert chunks[0]["similarity"] == 0.8
+    assert "Fusion output doubled in 2025." in context
+    assert "Source: https://example.com/fusion" in context
+    assert "Query: fusion progress" in context
+    assert "Earlier fusion research summary" in context
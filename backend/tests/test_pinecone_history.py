@@ -0,0 +1,56 @@
+"""
+PineconeHistoryManager upsert retries against a fake index
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("pinecone")
+pytest.importorskip("cachetools")
+urllib3_exceptions = pytest.importorskip("urllib3.exceptions")
+
+from app import pinecone_history
+from app.pinecone_history import PineconeHistoryManager
+
+
+class _FlakyIndex:
+    """Raises the queued errors on upsert, then succeeds"""
+    
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+    
+    def upsert(self, vectors, namespace):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"upserted_count": len(vectors)}
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.delenv("PINECONE_API_KEY", raising=False)
+    monkeypatch.setattr(pinecone_history, "HISTORY_RETRY_INITIAL", 0.001)
+    manager = PineconeHistoryManager()
+    yield manager
+    manager.shutdown()
+
+
+def test_upsert_retries_urllib3_connection_drop(manager):
+    dropped = urllib3_exceptions.ProtocolError(
+        "Connection aborted.", ConnectionResetError(104, "Connection reset by peer")
+    )
+    manager.index = _FlakyIndex([dropped])
+    
+    asyncio.run(manager._upsert([{"id": "a", "values": [0.0], "metadata": {}}]))
+    
+    assert manager.index.calls == 2
+
+
+def test_upsert_does_not_retry_permanent_errors(manager):
+    manager.index = _FlakyIndex([ValueError("metadata too large")])
+    
+    with pytest.raises(ValueError):
+        asyncio.run(manager._upsert([{"id": "a", "values": [0.0], "metadata": {}}]))
+    assert manager.index.calls == 1
@@ -0,0 +1,56 @@
+"""
+TopicGraphAgent in-memory bounds (per-user topic cap and user LRU)
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.agents import topic_graph_agent
+from app.agents.topic_graph_agent import TopicGraphAgent
+
+
+class _FakeEmbedder:
+    """Deterministic 4-d embeddings derived from the text hash"""
+
+    def encode(self, texts):
+        if isinstance(texts, str):
+            return self._embed(texts)
+        return [self._embed(text) for text in texts]
+
+    @staticmethod
+    def _embed(text):
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return rng.standard_normal(4).astype(np.float32)
+
+
+def _store(agent, user_id, query):
+    item = {"query": query, "summary": "", "user_id": user_id}
+    return agent._store_topic(item, agent.embedder.encode(query))
+
+
+def test_per_user_topics_are_trimmed(monkeypatch):
+    monkeypatch.setattr(topic_graph_agent, "TOPIC_MAX_PER_USER", 8)
+    agent = TopicGraphAgent(chroma_memory=None, embedder=_FakeEmbedder())
+
+    for i in range(9):
+        _store(agent, "user-a", f"topic {i}")
+
+    topics = agent._topics["user-a"]
+    assert [t["query"] for t in topics] == [f"topic {i}" for i in range(3, 9)]
+    assert len(agent._topic_vectors["user-a"]) == len(topics)
+    assert len(agent._topic_index["user-a"]) == len(topics)
+
+
+def test_least_recently_used_user_is_evicted(monkeypatch):
+    monkeypatch.setattr(topic_graph_agent, "TOPIC_MAX_USERS", 2)
+    agent = TopicGraphAgent(chroma_memory=None, embedder=_FakeEmbedder())
+
+    _store(agent, "user-a", "a")
+    _store(agent, "user-b", "b")
+    _store(agent, "user-a", "a2")  # user-b is now least recently used
+    _store(agent, "user-c", "c")
+
+    assert set(agent._topics) == {"user-a", "user-c"}
+    for state in (agent._topic_vectors, agent._topic_index):
+        assert "user-b" not in state
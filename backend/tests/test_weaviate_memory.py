@@ -0,0 +1,82 @@
+"""
+WeaviateMemory batch ingestion against a fake collection batcher
+"""
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("weaviate")
+
+from app.agents.weaviate_memory import WeaviateMemory
+
+
+class _FakeBatcher:
+    """Mimics collection.batch: one shared object whose failed_objects tracks the last context"""
+    
+    def __init__(self):
+        self.failed_objects = []
+        self.contexts = []
+        self.active = 0
+        self.max_active = 0
+        self._guard = threading.Lock()
+    
+    @contextmanager
+    def fixed_size(self, batch_size, concurrent_requests):
+        with self._guard:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.failed_objects = []
+        objects = []
+        self.contexts.append({"concurrent_requests": concurrent_requests, "objects": objects})
+        try:
+            yield SimpleNamespace(add_object=lambda **kwargs: objects.append(kwargs))
+        finally:
+            with self._guard:
+                self.active -= 1
+
+
+def _make_memory():
+    memory = object.__new__(WeaviateMemory)
+    memory._initialized = False
+    WeaviateMemory.__init__(memory)
+    memory.client = object()  # marks the memory as connected
+    memory.research_chunks = SimpleNamespace(batch=_FakeBatcher())
+    return memory
+
+
+def _inputs(count):
+    chunks = [f"chunk {i}" for i in range(count)]
+    embeddings = np.random.rand(count, 4).astype(np.float32)
+    metadata = [{"url": f"https://example.com/{i}", "chunk_index": i} for i in range(count)]
+    return chunks, embeddings, metadata
+
+
+def test_batch_upload_uses_one_context_with_parallel_requests():
+    memory = _make_memory()
+    chunks, embeddings, metadata = _inputs(25)
+    
+    ids = asyncio.run(memory.add_research_chunks_batch(chunks, embeddings, metadata, "q", parallel_workers=3))
+    
+    batcher = memory.research_chunks.batch
+    assert len(ids) == 25
+    assert len(batcher.contexts) == 1
+    assert batcher.contexts[0]["concurrent_requests"] == 3
+    assert [obj["properties"]["content"] for obj in batcher.contexts[0]["objects"]] == chunks
+
+
+def test_concurrent_uploads_never_share_the_batch():
+    memory = _make_memory()
+    
+    async def run_all():
+        uploads = [memory.add_research_chunks_batch(*_inputs(10), f"q{i}") for i in range(6)]
+        return await asyncio.gather(*uploads)
+    
+    results = asyncio.run(run_all())
+    
+    assert all(len(ids) == 10 for ids in results)
+    assert memory.research_chunks.batch.max_active == 1
@@ -9,15 +9,17 @@
 
 import { api } from './client';
 
+// Max entry IDs per bulk delete request (matches the backend limit)
+const MAX_DELETE_IDS = 1000;
+
 /**
- * Fetch user's search history
- * @param {string} userId - User ID (must be authenticated)
+ * Fetch the signed-in user's search history (user comes from the auth token)
  * @param {number} limit - Maximum number of entries to return (default: 50)
  * @returns {Promise<Array>} Array of history entries
  */
-export const getHistory = async (userId, limit = 50) => {
+export const getHistory = async (limit = 50) => {
   try {
-    const response = await api.get(`/history/${userId}?limit=${limit}`);
+    const response = await api.get(`/history?limit=${limit}`);
     
     if (response.data?.status === 'success') {
       return response.data.history || [];
@@ -56,14 +58,13 @@ export const saveHistory = async (data) => {
 };
 
 /**
- * Delete a specific history entry
- * @param {string} userId - User ID
+ * Delete a specific history entry of the signed-in user
  * @param {string} entryId - History entry ID to delete
  * @returns {Promise<boolean>} Success status
  */
-export const deleteHistoryEntry = async (userId, entryId) => {
+export const deleteHistoryEntry = async (entryId) => {
   try {
-    const response = await api.delete(`/history/${userId}/${entryId}`);
+    const response = await api.delete(`/history/${entryId}`);
     
     if (response.data?.deleted) {
       console.log('✅ History entry deleted');
@@ -77,22 +78,25 @@ export const deleteHistoryEntry = async (userId, entryId) => {
 };
 
 /**
- * Clear all history entries for a user
- * @param {string} userId - User ID
+ * Clear all history entries of the signed-in user in one request
+ * (the backend accepts at most MAX_DELETE_IDS ids per call, so larger lists are split)
  * @param {Array} historyItems - All history items to delete
- * @returns {Promise<number>} Number of entries deleted
+ * @returns {Promise<Object>} Map of entry ID -> whether it was deleted
  */
-export const clearAllHistory = async (userId, historyItems) => {
+export const clearAllHistory = async (historyItems) => {
   try {
-    let deletedCount = 0;
-    
-    for (const item of historyItems) {
-      const success = await deleteHistoryEntry(userId, item.id);
-      if (success) deletedCount++;
+    const ids = historyItems.map(item => item.id);
+    const results = {};
+    for (let start = 0; start < ids.length; start += MAX_DELETE_IDS) {
+      const response = await api.post('/history/delete', {
+        entry_ids: ids.slice(start, start + MAX_DELETE_IDS)
+      });
+      Object.assign(results, response.data?.results || {});
     }
     
+    const deletedCount = Object.values(results).filter(Boolean).length;
     console.log(`✅ Deleted ${deletedCount} history entries`);
-    return deletedCount;
+    return results;
   } catch (error) {
     console.error('❌ Error clearing history:', error);
     throw error;
@@ -1,5 +1,6 @@
 import { useState, useEffect, useCallback } from 'react';
 import { api } from '../api/client';
+import { clearAllHistory as deleteAllHistoryEntries } from '../api/history';
 
 /**
  * useHistory Hook - Manage user search history
@@ -29,7 +30,7 @@ export function useHistory(userId) {
     try {
       console.log(`📖 Fetching search history for user ${uid.substring(0, 8)}...`);
       
-      const response = await api.get(`/history/${uid}?limit=${limit}`);
+      const response = await api.get(`/history?limit=${limit}`);
       
       if (response.data?.status === 'success') {
         setHistory(response.data.history || []);
@@ -101,7 +102,7 @@ export function useHistory(userId) {
     try {
       console.log(`🗑️ Deleting history entry ${entryId}`);
       
-      const response = await api.delete(`/history/${userId}/${entryId}`);
+      const response = await api.delete(`/history/${entryId}`);
       
       if (response.data?.deleted) {
         console.log('✅ History entry deleted');
@@ -129,19 +130,19 @@ export function useHistory(userId) {
     try {
       console.log(`🗑️ Clearing all history for user ${userId.substring(0, 8)}`);
       
-      // Delete all entries
-      for (const entry of history) {
-        await deleteHistoryEntry(entry.id);
-      }
+      // One bulk request instead of a DELETE per entry
+      const results = await deleteAllHistoryEntries(history);
+      setHistory(prev => prev.filter(item => !results[item.id]));
       
-      console.log('✅ All history cleared');
-      return true;
+      const cleared = history.every(item => results[item.id]);
+      console.log(cleared ? '✅ All history cleared' : '⚠️ Some history entries could not be deleted');
+      return cleared;
     } catch (err) {
       console.error('❌ Error clearing history:', err);
       setError(err.message || 'Failed to clear history');
       return false;
     }
-  }, [userId, history, deleteHistoryEntry]);
+  }, [userId, history]);
 
   // Auto-fetch history when userId changes - DISABLED for now to prevent crashes
   useEffect(() => {
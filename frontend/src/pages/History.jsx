@@ -20,7 +20,7 @@ const HistoryPage = () => {
     
     setLoading(true);
     try {
-      const response = await apiGet(`/history/${user.uid}?limit=50`);
+      const response = await apiGet('/history?limit=50');
       if (response.status === 'success') {
         setHistory(response.history || []);
         console.log(`✅ Loaded ${response.history?.length || 0} history entries`);
@@ -61,7 +61,7 @@ const HistoryPage = () => {
     if (!user?.uid) return;
     
     try {
-      await api(`/history/${user.uid}/${historyId}`, { method: 'DELETE' });
+      await api(`/history/${historyId}`, { method: 'DELETE' });
       setHistory(prev => prev.filter(h => h.id !== historyId));
       if (selectedHistory?.id === historyId) {
         setSelectedHistory(null);
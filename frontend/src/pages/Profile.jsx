@@ -43,7 +43,7 @@ const ProfilePage = () => {
     
     setLoading(true);
     try {
-      const response = await apiGet(`/history/${user.uid}?limit=100`);
+      const response = await apiGet('/history?limit=100');
       if (response.status === 'success' && response.history) {
         const history = response.history;
         